@@ -1,11 +1,29 @@
-from flask import Flask, render_template_string, request, redirect, url_for
-import pandas as pd
-import json
+from flask import Flask, render_template, request, redirect, url_for, jsonify, make_response, g
+import gzip
+import hashlib
 import os
-from coleta import executar_coleta 
+import threading
+import time
+from datetime import datetime, timezone
+import numpy as np
+from dados import repositorio
+from cache import resultados as cache_resultados, chave_resultado
+import historico
+import exportacao
+import fechamento
+import metricas
+from metricas import etapa
+from atualizacao import solicitar_atualizacao, iniciar_agendador, ler_status
+from motor import (matriz_probabilidades, coberturas_dos_tipos, coberturas_das_estrategias, indices_palpites, resumo_premios,
+                   otimizar_cobertura, processar_lote, VALOR_APOSTA_SIMPLES, NUM_JOGOS, SECO, COBERTURA_POR_TIPO,
+                   TEXTOS_PALPITE, CLASSES_PALPITE)
+
+try:
+    import brotli  # opcional: sem ele as respostas saem só em gzip
+except ImportError:
+    brotli = None
 
 app = Flask(__name__)
-NOME_ARQUIVO_DADOS = 'jogos.json'
 
 # --- 1. CONFIGURAÇÕES ---
 CONFIG_APOSTAS = {
@@ -16,6 +34,10 @@ CONFIG_APOSTAS = {
     "Dono da Zorra Toda": {"duplos": 5, "triplos": 3, "valor": 1728.00}
 }
 
+# Modo em que o usuário informa o orçamento e o motor escolhe duplos/triplos
+MODO_OTIMIZADO = "Otimizado pelo Orçamento"
+OBJETIVOS_OTIMIZACAO = {"p14": "Maior chance de 14", "esperado": "Mais acertos em média"}
+
 # Gabarito de Segurança (Offline)
 DEFAULTS_GABARITO = {
     1:  {"p1": 70, "px": 20, "p2": 10, "dica": ""},
@@ -34,89 +56,339 @@ DEFAULTS_GABARITO = {
     14: {"p1": 33, "px": 34, "p2": 33, "dica": "Jogo de Triplo (Equilíbrio Total)"}
 }
 
-# --- 2. FUNÇÕES LÓGICAS ---
-def carregar_dados_do_arquivo():
-    if not os.path.exists(NOME_ARQUIVO_DADOS):
-        return [], "Sem dados. Clique em Atualizar!"
-    try:
-        with open(NOME_ARQUIVO_DADOS, 'r', encoding='utf-8') as f:
-            pacote = json.load(f)
-            return pacote['jogos'], pacote['fonte']
-    except: return [], "Erro no arquivo."
+TIPOS_COBERTURA = {c: t for t, c in COBERTURA_POR_TIPO.items()}
 
+# --- 2. FUNÇÕES LÓGICAS ---
 def gerar_palpite(p1, px, p2, tipo):
-    probs = {'1': p1, 'X': px, '2': p2}
-    ordenado = sorted(probs.items(), key=lambda x: x[1], reverse=True)
-    fav, vice = ordenado[0][0], ordenado[1][0]
-    
-    if tipo == "TRIPLO": 
-        return "TRIPLO (1 X 2)", "bg-primary text-white border-primary"
-    elif tipo == "DUPLO":
-        palpite = "".join(sorted([fav, vice])).replace('12', '1 2')
-        return f"DUPLO {palpite}", "bg-warning text-dark border-warning"
-    else: 
-        return f"COLUNA {fav}", "bg-success text-white border-success"
-
-def aplicar_estrategia(df, nome_estrategia):
-    if df.empty: return df
+    # Favorito e vice por comparação direta (empates seguem a ordem 1, X, 2)
+    fav = 0 if p1 >= px and p1 >= p2 else 1 if px >= p2 else 2
+    a, b = [(1, 2), (0, 2), (0, 1)][fav]
+    vice = a if (p1, px, p2)[a] >= (p1, px, p2)[b] else b
+    idx = (COBERTURA_POR_TIPO.get(tipo, SECO) - 1) * 9 + fav * 3 + vice
+    return TEXTOS_PALPITE[idx], CLASSES_PALPITE[idx]
+
+def _matriz(jogos):
+    return np.array([[j['Prob_Casa'], j['Prob_Empate'], j['Prob_Fora']] for j in jogos], dtype=float)
+
+def aplicar_estrategia(jogos, nome_estrategia):
+    if not jogos: return []
     config = CONFIG_APOSTAS.get(nome_estrategia, CONFIG_APOSTAS["Econômico"])
-    
-    df['Risco'] = 100 - df[['Prob_Casa', 'Prob_Empate', 'Prob_Fora']].max(axis=1)
-    df_sorted = df.sort_values(by='Risco', ascending=False)
-    
-    ind_triplos = df_sorted.head(config['triplos']).index
-    restante = df_sorted.drop(ind_triplos)
-    ind_duplos = restante.head(config['duplos']).index
-
-    palpites, classes = [], []
-    for idx in df.index:
-        tipo = "TRIPLO" if idx in ind_triplos else "DUPLO" if idx in ind_duplos else "SECO"
-        txt, css = gerar_palpite(df.at[idx,'Prob_Casa'], df.at[idx,'Prob_Empate'], df.at[idx,'Prob_Fora'], tipo)
-        palpites.append(txt)
-        classes.append(css)
-
-    df['Palpite IA'] = palpites
-    df['Classe_CSS'] = classes
-    return df.sort_values(by='Jogo')
+    probs = _matriz(jogos)
+    coberturas = coberturas_das_estrategias(probs[None], [(config['duplos'], config['triplos'])])[0, 0]
+    return _montar_palpites(jogos, probs, coberturas)
+
+def aplicar_otimizacao(jogos, orcamento, objetivo="p14"):
+    # Em vez dos presets, o motor escolhe a melhor combinação de duplos/triplos que cabe no orçamento
+    if not jogos: return [], 0.0
+    probs = _matriz(jogos)
+    resultado = otimizar_cobertura(probs, orcamento, objetivo)
+    if resultado is None:
+        raise ValueError(f"Orçamento mínimo é R$ {VALOR_APOSTA_SIMPLES:.2f}")
+    return _montar_palpites(jogos, probs, resultado['coberturas']), resultado['valor']
+
+def _montar_palpites(jogos, probs, coberturas):
+    indices = indices_palpites(probs, coberturas).tolist()
+    riscos = (100 - probs.max(axis=1)).tolist()
+    linhas = []
+    for jogo, cobertura, idx, risco in zip(jogos, coberturas.tolist(), indices, riscos):
+        linha = dict(jogo)
+        linha['Risco'] = risco
+        linha['Tipo'] = TIPOS_COBERTURA[cobertura]
+        linha['Palpite IA'] = TEXTOS_PALPITE[idx]
+        linha['Classe_CSS'] = CLASSES_PALPITE[idx]
+        linhas.append(linha)
+    return sorted(linhas, key=lambda j: j['Jogo'])
+
+def calcular_chances(linhas):
+    # Distribuição exata de acertos do bilhete (P14, P13 e média de acertos)
+    probs = matriz_probabilidades(_matriz(linhas))
+    resumo = resumo_premios(probs, coberturas_dos_tipos(j['Tipo'] for j in linhas))
+    return {"p14": float(resumo['p14']) * 100, "p13": float(resumo['p13']) * 100, "esperado": float(resumo['esperado'])}
+
+def avaliar_concursos(concursos, estrategias=None):
+    # Lote: N concursos x M estratégias em uma única passada vetorizada
+    estrategias = list(estrategias or CONFIG_APOSTAS)
+    invalidas = [e for e in estrategias if e not in CONFIG_APOSTAS]
+    if invalidas: raise ValueError(f"Estratégias desconhecidas: {', '.join(invalidas)}")
+    if not concursos: raise ValueError("Nenhum concurso informado.")
+    for n, jogos in enumerate(concursos):
+        if len(jogos) != NUM_JOGOS: raise ValueError(f"Concurso {n} tem {len(jogos)} jogos (esperado {NUM_JOGOS}).")
+
+    probs = [[[j['Prob_Casa'], j['Prob_Empate'], j['Prob_Fora']] for j in jogos] for jogos in concursos]
+    lote = processar_lote(probs, [(CONFIG_APOSTAS[e]['duplos'], CONFIG_APOSTAS[e]['triplos']) for e in estrategias])
+
+    resultado = []
+    for n, jogos in enumerate(concursos):
+        por_estrategia = {}
+        for m, nome in enumerate(estrategias):
+            por_estrategia[nome] = {
+                "valor": float(lote['custos'][m]),
+                "p14": float(lote['p14'][n, m]),
+                "p13": float(lote['p13'][n, m]),
+                "esperado": float(lote['esperado'][n, m]),
+                "palpites": lote['palpites'][n, m].tolist(),
+            }
+        resultado.append({"jogos": [f"{j['Mandante']} x {j['Visitante']}" for j in jogos], "estrategias": por_estrategia})
+    return resultado
 
 # --- 3. ROTAS DO SITE ---
+@app.route('/api/lote', methods=['POST'])
+def api_lote():
+    pacote = request.get_json(silent=True) or {}
+    if not isinstance(pacote, dict):
+        return jsonify({"erro": "Esperado um objeto JSON com 'concursos'."}), 400
+    try:
+        concursos = [c['jogos'] if isinstance(c, dict) else c for c in pacote.get('concursos', [])]
+        return jsonify(avaliar_concursos(concursos, pacote.get('estrategias')))
+    except (ValueError, KeyError, TypeError) as e:
+        return jsonify({"erro": str(e)}), 400
+
+@app.route('/exportar', methods=['POST'])
+def exportar():
+    # Expande o bilhete da página de resultado em apostas simples, enviadas em streaming.
+    # Com garantia < 14, exporta o fechamento (sistema reduzido) em vez de todas as combinações.
+    formato = request.form.get('formato', 'csv')
+    por_volante = request.form.get('por_volante', type=int)  # vazio -> None (sem coluna de volante)
+    garantia = request.form.get('garantia', NUM_JOGOS, type=int)
+    try:
+        if formato not in exportacao.FORMATOS: raise ValueError(f"Formato desconhecido: {formato}")
+        if por_volante is not None and por_volante < 1: raise ValueError("Apostas por volante deve ser positivo.")
+        jogos = [{"Jogo": i, "Mandante": request.form.get(f'time1_{i}', ''), "Visitante": request.form.get(f'time2_{i}', ''),
+                  "Palpite IA": request.form.get(f'palpite_{i}'), "Prob_Casa": request.form.get(f'p1_{i}', 1, type=float),
+                  "Prob_Empate": request.form.get(f'px_{i}', 1, type=float), "Prob_Fora": request.form.get(f'p2_{i}', 1, type=float)}
+                 for i in range(1, NUM_JOGOS + 1)]
+        opcoes = [exportacao.opcoes_do_palpite(j['Palpite IA']) for j in jogos]
+        if garantia < NUM_JOGOS:
+            sistema = fechamento.gerar_fechamento(jogos, garantia, trabalhadores=1, limite=fechamento.MAXIMO_COMBINACOES_WEB)
+            total, bilhetes = sistema['apostas'], fechamento.bilhetes(sistema)
+        else:
+            total, bilhetes = exportacao.total_apostas(opcoes), exportacao.expandir(opcoes)
+    except ValueError as e:
+        return f"Erro: {e}", 400
+    if total > exportacao.MAXIMO_APOSTAS[formato]:
+        return f"Erro: {total} apostas passam do limite de {exportacao.MAXIMO_APOSTAS[formato]} em {formato.upper()}", 400
+    arquivo = exportacao.gerar_arquivo(formato, bilhetes, exportacao.cabecalho(jogos, por_volante), por_volante)
+    resposta = app.response_class(arquivo, content_type=exportacao.FORMATOS[formato])
+    sufixo = f"-garantia-{garantia}" if garantia < NUM_JOGOS else ""
+    resposta.headers['Content-Disposition'] = f'attachment; filename="loteca-{total}-apostas{sufixo}.{formato}"'
+    return resposta
+
 @app.route('/atualizar_agora')
 def forcar_atualizacao():
+    # A coleta roda em segundo plano; a página volta na hora com os últimos dados
+    solicitar_atualizacao()
+    return redirect(url_for('home'))
+
+@app.route('/status_atualizacao')
+def status_atualizacao():
+    return jsonify(ler_status())
+
+@app.route('/status_cache')
+def status_cache():
+    return jsonify(cache_resultados.estatisticas())
+
+@app.route('/api/historico/time/<path:nome>')
+def api_historico_time(nome):
+    return jsonify(historico.jogos_do_time(nome, limite=request.args.get('limite', 200, type=int)))
+
+@app.route('/api/historico/deriva/<int:concurso>/<int:jogo>')
+def api_historico_deriva(concurso, jogo):
+    return jsonify(historico.deriva_probabilidades(concurso, jogo))
+
+@app.before_request
+def garantir_agendador():
+    iniciar_agendador()
+
+# --- 4. INSTRUMENTAÇÃO ---
+# Registrada antes da compressão: os after_request rodam em ordem inversa, então a
+# duração medida inclui a compressão da resposta
+@app.before_request
+def iniciar_medicao():
+    if metricas.HABILITADO:
+        g.inicio_requisicao = time.perf_counter()
+        metricas.iniciar_etapas()
+    if metricas.MODO_PERFIL and metricas.perfil_solicitado(request.headers):
+        g.perfil = metricas.iniciar_perfil()
+
+@app.after_request
+def registrar_medicao(resposta):
+    rota = request.url_rule.rule if request.url_rule else 'desconhecida'
+    perfil = g.pop('perfil', None)
+    if perfil is not None:
+        resposta.headers['X-Perfil'] = metricas.salvar_perfil(perfil, rota)
+    inicio = g.pop('inicio_requisicao', None)
+    if inicio is not None:
+        decorrido = time.perf_counter() - inicio
+        metricas.REQUISICOES.observar(decorrido, rota, request.method)
+        metricas.RESPOSTAS.incrementar(rota, request.method, resposta.status_code)
+        etapas = metricas.encerrar_etapas() + [('total', decorrido)]
+        resposta.headers['Server-Timing'] = metricas.server_timing(etapas)
+    return resposta
+
+@app.route('/metrics')
+def metrics():
+    estatisticas = cache_resultados.estatisticas()
+    extras = [
+        ("loteca_cache_resultados_total", "counter", "Consultas ao cache de resultados do POST /",
+         [({"resultado": r}, estatisticas[c]) for r, c in (("acerto", "acertos"), ("acerto_compartilhado", "acertos_compartilhados"), ("falha", "falhas"))]),
+        ("loteca_cache_resultados_taxa_acerto", "gauge", "Fração das consultas atendidas pelo cache de resultados",
+         [({}, estatisticas["taxa_acerto"])]),
+        ("loteca_cache_resultados_itens", "gauge", "Resultados guardados no cache local", [({}, estatisticas["tamanho"])]),
+    ]
+    resposta = make_response(metricas.expor(extras))
+    resposta.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+    return resposta
+
+# --- 5. CACHE HTTP E COMPRESSÃO ---
+MAX_PAGINAS_CACHE = 32
+TAMANHO_MINIMO_COMPRESSAO = 500
+_cache_paginas = {}
+_trava_paginas = threading.Lock()
+_inicio_processo = datetime.now(timezone.utc).replace(microsecond=0)
+
+def _guardar_pagina(chave, corpo, modificado_em):
+    corpo = corpo.encode('utf-8')
+    pagina = {"identity": corpo, "etag": hashlib.sha1(corpo).hexdigest(), "modificado_em": modificado_em or _inicio_processo}
+    with _trava_paginas:
+        # Páginas de versões antigas dos dados não voltam mais: descarta tudo ao encher
+        if len(_cache_paginas) >= MAX_PAGINAS_CACHE:
+            _cache_paginas.clear()
+        _cache_paginas[chave] = pagina
+    return pagina
+
+def _codificacao_aceita():
+    aceitas = request.accept_encodings
+    if brotli is not None and aceitas['br']:
+        return 'br'
+    if aceitas['gzip']:
+        return 'gzip'
+    return 'identity'
+
+def _comprimir(corpo, codificacao):
+    if codificacao == 'br':
+        return brotli.compress(corpo, quality=5)
+    return gzip.compress(corpo, compresslevel=6)
+
+def _responder_pagina(pagina):
+    codificacao = _codificacao_aceita()
+    if codificacao not in pagina:
+        pagina[codificacao] = _comprimir(pagina["identity"], codificacao)
+    resposta = make_response(pagina[codificacao])
+    resposta.mimetype = 'text/html'
+    if codificacao != 'identity':
+        resposta.headers['Content-Encoding'] = codificacao
+    resposta.headers['Vary'] = 'Accept-Encoding'
+    resposta.headers['Cache-Control'] = 'no-cache'
+    resposta.set_etag(pagina["etag"] + ('' if codificacao == 'identity' else f'-{codificacao}'))
+    resposta.last_modified = pagina["modificado_em"]
+    return resposta.make_conditional(request)
+
+@app.after_request
+def comprimir_resposta(resposta):
+    if (resposta.direct_passthrough or resposta.is_streamed or resposta.status_code != 200
+            or 'Content-Encoding' in resposta.headers
+            or not (resposta.mimetype.startswith('text/') or resposta.mimetype == 'application/json')):
+        return resposta
+    corpo = resposta.get_data()
+    codificacao = _codificacao_aceita()
+    if len(corpo) < TAMANHO_MINIMO_COMPRESSAO or codificacao == 'identity':
+        return resposta
+    resposta.set_data(_comprimir(corpo, codificacao))
+    resposta.headers['Content-Encoding'] = codificacao
+    resposta.vary.add('Accept-Encoding')
+    return resposta
+
+# --- 6. ROTAS DAS PÁGINAS ---
+@app.route('/telegram')
+def telegram():
+    return render_template('index.html', configs=CONFIG_APOSTAS)
+
+@app.route('/api/processar', methods=['POST'])
+def api_processar():
+    # Usado pelo index.html (Telegram): recebe odds e devolve os palpites do plano
+    pacote = request.get_json(silent=True) or {}
+    if not isinstance(pacote, dict):
+        return jsonify({"erro": "Esperado um objeto JSON com 'jogos' e 'plano'."}), 400
+    plano = pacote.get('plano')
+    if not isinstance(plano, str) or plano not in CONFIG_APOSTAS:
+        return jsonify({"erro": f"Plano desconhecido: {plano!r}"}), 400
     try:
-        executar_coleta()
-        return redirect(url_for('home'))
-    except Exception as e: return f"Erro: {e}"
+        jogos = []
+        for j in pacote.get('jogos', []):
+            inversas = [1 / float(j[o]) if float(j[o]) > 0 else 0 for o in ('o1', 'ox', 'o2')]
+            total = sum(inversas) or 1
+            jogos.append({"Jogo": int(j['id']), "Mandante": j.get('mandante', ''), "Visitante": j.get('visitante', ''),
+                          "Prob_Casa": inversas[0] / total * 100, "Prob_Empate": inversas[1] / total * 100, "Prob_Fora": inversas[2] / total * 100})
+    except (ValueError, KeyError, TypeError) as e:
+        return jsonify({"erro": str(e)}), 400
+    classes = {"TRIPLO": "card-triplo", "DUPLO": "card-duplo", "SECO": "card-seco"}
+    return jsonify([{"id": j['Jogo'], "mandante": j['Mandante'], "visitante": j['Visitante'],
+                     "palpite": j['Palpite IA'], "classe": classes[j['Tipo']]}
+                    for j in aplicar_estrategia(jogos, plano)])
 
 @app.route('/', methods=['GET', 'POST'])
 def home():
     modo = request.args.get('modo', 'Econômico')
 
     if request.method == 'POST':
-        modo = request.form.get('modo_selecionado')
-        dados_form = []
-        for i in range(1, 15):
-            mandante = request.form.get(f'time1_{i}')
-            visitante = request.form.get(f'time2_{i}')
-            p1 = float(request.form.get(f'range1_{i}'))
-            px = float(request.form.get(f'rangex_{i}'))
-            p2 = float(request.form.get(f'range2_{i}'))
-            
-            total = p1 + px + p2
-            if total == 0: total = 1
-            p1 = (p1 / total) * 100
-            px = (px / total) * 100
-            p2 = (p2 / total) * 100
-
-            dados_form.append({"Jogo": i, "Mandante": mandante, "Visitante": visitante, "Prob_Casa": p1, "Prob_Empate": px, "Prob_Fora": p2})
-        df_final = aplicar_estrategia(pd.DataFrame(dados_form), modo)
+        with etapa('formulario'):
+            modo = request.form.get('modo_selecionado')
+            dados_form = []
+            for i in range(1, 15):
+                mandante = request.form.get(f'time1_{i}')
+                visitante = request.form.get(f'time2_{i}')
+                p1 = float(request.form.get(f'range1_{i}'))
+                px = float(request.form.get(f'rangex_{i}'))
+                p2 = float(request.form.get(f'range2_{i}'))
+                
+                total = p1 + px + p2
+                if total == 0: total = 1
+                p1 = (p1 / total) * 100
+                px = (px / total) * 100
+                p2 = (p2 / total) * 100
+
+                dados_form.append({"Jogo": i, "Mandante": mandante, "Visitante": visitante, "Prob_Casa": p1, "Prob_Empate": px, "Prob_Fora": p2})
+            extras = {"orcamento": request.form.get('orcamento'), "objetivo": request.form.get('objetivo')} if modo == MODO_OTIMIZADO else None
+        with etapa('cache_resultado'):
+            chave = chave_resultado(dados_form, modo, extras, repositorio.versao())
+            html = cache_resultados.obter(chave)
+        if html is not None:
+            return html
+
+        with etapa('estrategia'):
+            if modo == MODO_OTIMIZADO:
+                try:
+                    orcamento = float(request.form.get('orcamento', 0))
+                    objetivo = request.form.get('objetivo', 'p14')
+                    jogos_final, val_total = aplicar_otimizacao(dados_form, orcamento, objetivo)
+                except ValueError as e: return f"Erro: {e}", 400
+            else:
+                jogos_final = aplicar_estrategia(dados_form, modo)
+                val_total = CONFIG_APOSTAS.get(modo, CONFIG_APOSTAS['Econômico'])['valor']
         
         # Renderiza RESULTADO
-        val_total = CONFIG_APOSTAS.get(modo, CONFIG_APOSTAS['Econômico'])['valor']
-        return render_template_string(HTML_RESULTADO, df=df_final, modo=modo, valor=val_total)
+        with etapa('chances'):
+            chances = calcular_chances(jogos_final)
+        with etapa('render'):
+            html = render_template('resultado.html', jogos=jogos_final, modo=modo, valor=val_total, chances=chances,
+                                   apostas=round(val_total / VALOR_APOSTA_SIMPLES))
+        cache_resultados.guardar(chave, html)
+        return html
 
-    # Renderiza MANUAL
-    dados_lista, fonte = carregar_dados_do_arquivo()
-    
+    # Renderiza MANUAL (cacheado por versão dos dados + modo + estado da atualização)
+    with etapa('carregar_dados'):
+        dados_lista, fonte, versao = repositorio.carregar()
+        status = ler_status()
+    chave = (versao, modo, status.get("estado"), status.get("erro"))
+    pagina = _cache_paginas.get(chave)
+    metricas.CACHE_PAGINAS.incrementar('falha' if pagina is None else 'acerto')
+    if pagina is None:
+        with etapa('render'):
+            corpo = _renderizar_manual(dados_lista, fonte, modo, status)
+        pagina = _guardar_pagina(chave, corpo, repositorio.modificado_em())
+    return _responder_pagina(pagina)
+
+def _renderizar_manual(dados_lista, fonte, modo, status):
     if "Vovoteca" not in fonte: 
         times_backup = [
             ("CORINTHIANS/SP", "PONTE PRETA/SP"), ("JUVENTUDE/RS", "YPIRANGA/RS"),
@@ -146,197 +418,11 @@ def home():
             "p1": int(row['Prob_Casa']), "p2": int(row['Prob_Fora']), "px": int(row['Prob_Empate']),
             "dica": dica
         })
-        
-    return render_template_string(HTML_MANUAL, jogos=lista_jogos_sliders, modo=modo, configs=CONFIG_APOSTAS, fonte=fonte)
-
-# --- 4. TEMPLATES HTML (FICAM NO FINAL PARA NÃO ATRAPALHAR) ---
-
-HTML_MANUAL = """
-<!doctype html>
-<html lang="pt-br" data-bs-theme="dark">
-<head>
-    <meta charset="utf-8"> <meta name="viewport" content="width=device-width, initial-scale=1">
-    <title>Loteca Pro IA</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-    <style>
-        body { background: #121212; font-family: 'Segoe UI', sans-serif; padding-top: 80px; color: #e0e0e0; }
-        .navbar-custom { position: fixed; top: 0; left: 0; width: 100%; z-index: 1000; background: #1f1f1f; box-shadow: 0 4px 12px rgba(0,0,0,0.5); padding: 12px 0; border-bottom: 1px solid #333; }
-        .card-game { background: #1e1e1e; border-radius: 12px; padding: 20px; margin-bottom: 20px; box-shadow: 0 4px 6px rgba(0,0,0,0.3); border: 1px solid #333; }
-        .team-box { width: 42%; text-align: center; font-weight: 700; font-size: 0.95rem; color: #ffffff; text-shadow: 0 1px 2px rgba(0,0,0,0.5); }
-        .vs-badge { background: #333; color: #aaa; padding: 4px 8px; border-radius: 8px; font-size: 0.75rem; font-weight: bold; border: 1px solid #444; }
-        .risk-alert { font-size: 0.8rem; background: #2c1515; color: #ff8b8b; padding: 10px; border-radius: 6px; margin-top: 15px; border-left: 3px solid #e53e3e; display: flex; align-items: center; gap: 8px; }
-        .slider-row { display: flex; justify-content: space-between; gap: 10px; height: 160px; align-items: flex-end; padding: 0 10px; }
-        .slider-col { position: relative; width: 30%; height: 100%; display: flex; flex-direction: column; justify-content: flex-end; align-items: center; }
-        .custom-range { -webkit-appearance: slider-vertical; width: 100%; height: 100%; opacity: 0; position: absolute; bottom: 0; z-index: 5; cursor: pointer; }
-        .bar-bg { width: 10px; height: 100%; background: #333; border-radius: 10px; position: absolute; bottom: 0; z-index: 1; border: 1px solid #444; }
-        .bar-fill { width: 10px; border-radius: 10px; position: absolute; bottom: 0; z-index: 2; transition: height 0.15s ease-out; box-shadow: 0 0 10px rgba(0,0,0,0.5); }
-        .thumb-val { width: 36px; height: 36px; background: #2d2d2d; border-radius: 50%; box-shadow: 0 2px 5px rgba(0,0,0,0.5); border: 2px solid; position: absolute; z-index: 3; display: flex; align-items: center; justify-content: center; font-weight: 800; font-size: 0.75rem; pointer-events: none; transition: bottom 0.15s ease-out; margin-bottom: -18px; color: #fff; }
-        .casa .bar-fill { background: linear-gradient(to top, #198754, #2ecc71); } .casa .thumb-val { border-color: #2ecc71; color: #2ecc71; }
-        .empate .bar-fill { background: linear-gradient(to top, #d39e00, #f1c40f); } .empate .thumb-val { border-color: #f1c40f; color: #f1c40f; }
-        .fora .bar-fill { background: linear-gradient(to top, #c0392b, #e74c3c); } .fora .thumb-val { border-color: #e74c3c; color: #e74c3c; }
-        .lbl-top { margin-bottom: auto; font-size: 0.75rem; font-weight: bold; color: #888; text-transform: uppercase; letter-spacing: 1px; }
-    </style>
-</head>
-<body>
-<div class="navbar-custom">
-    <div class="container d-flex justify-content-between">
-        <div class="d-flex align-items-center gap-2">
-            <i class="fa-solid fa-robot text-success fs-4"></i>
-            <h5 class="m-0 fw-bold text-white">Loteca Pro IA <small class="text-secondary ms-2">v8.0</small></h5>
-        </div>
-        <a href="/atualizar_agora" class="btn btn-sm btn-outline-light fw-bold rounded-pill px-3"><i class="fa-solid fa-sync-alt me-1"></i> Atualizar</a>
-    </div>
-</div>
-<div class="container">
-    <form method="POST" action="/">
-        <div class="card border-0 shadow-sm mb-4" style="background: #252525; border-radius: 16px; border: 1px solid #333;">
-            <div class="card-body text-center p-4">
-                <label class="text-uppercase text-secondary fw-bold" style="font-size: 0.75rem; letter-spacing: 1px;">Estratégia & Orçamento</label>
-                <div class="d-flex justify-content-center mt-2">
-                    <select name="modo_selecionado" class="form-select form-select-lg text-center fw-bold border-0 shadow-sm" style="max-width: 400px; border-radius: 12px; background: #333; color: #fff;">
-                        {% for n, c in configs.items() %}
-                        <option value="{{ n }}" {% if n == modo %}selected{% endif %}>{{ n }} • R$ {{ "%.2f"|format(c['valor'])|replace('.', ',') }}</option>
-                        {% endfor %}
-                    </select>
-                </div>
-            </div>
-        </div>
-        <div class="row">
-        {% for jogo in jogos %}
-            <div class="col-md-6 col-lg-4">
-                <div class="card-game">
-                    <div class="d-flex justify-content-between mb-3">
-                        <span class="badge bg-dark border border-secondary text-secondary">{{ jogo.Jogo }}</span>
-                        {% if jogo.dica %}<i class="fa-solid fa-circle-exclamation text-warning" title="Risco"></i>{% endif %}
-                    </div>
-                    <div class="game-header">
-                        <div class="team-box text-start">{{ jogo.Mandante }}</div>
-                        <div class="vs-badge">VS</div>
-                        <div class="team-box text-end">{{ jogo.Visitante }}</div>
-                        <input type="hidden" name="time1_{{ jogo.Jogo }}" value="{{ jogo.Mandante }}">
-                        <input type="hidden" name="time2_{{ jogo.Jogo }}" value="{{ jogo.Visitante }}">
-                    </div>
-                    <div class="slider-row">
-                        <div class="slider-col casa">
-                            <div class="lbl-top">Casa</div>
-                            <input type="range" class="custom-range" min="0" max="100" value="{{ jogo.p1 }}" name="range1_{{ jogo.Jogo }}" id="r1_{{ jogo.Jogo }}" oninput="upd({{ jogo.Jogo }}, 'p1')">
-                            <div class="bar-bg"></div><div class="bar-fill" id="bar1_{{ jogo.Jogo }}"></div><div class="thumb-val" id="thumb1_{{ jogo.Jogo }}">{{ jogo.p1 }}</div>
-                        </div>
-                        <div class="slider-col empate">
-                            <div class="lbl-top">X</div>
-                            <input type="range" class="custom-range" min="0" max="100" value="{{ jogo.px }}" name="rangex_{{ jogo.Jogo }}" id="rx_{{ jogo.Jogo }}" oninput="upd({{ jogo.Jogo }}, 'px')">
-                            <div class="bar-bg"></div><div class="bar-fill" id="barx_{{ jogo.Jogo }}"></div><div class="thumb-val" id="thumbx_{{ jogo.Jogo }}">{{ jogo.px }}</div>
-                        </div>
-                        <div class="slider-col fora">
-                            <div class="lbl-top">Fora</div>
-                            <input type="range" class="custom-range" min="0" max="100" value="{{ jogo.p2 }}" name="range2_{{ jogo.Jogo }}" id="r2_{{ jogo.Jogo }}" oninput="upd({{ jogo.Jogo }}, 'p2')">
-                            <div class="bar-bg"></div><div class="bar-fill" id="bar2_{{ jogo.Jogo }}"></div><div class="thumb-val" id="thumb2_{{ jogo.Jogo }}">{{ jogo.p2 }}</div>
-                        </div>
-                    </div>
-                    {% if jogo.dica %}
-                    <div class="risk-alert"><i class="fa-solid fa-triangle-exclamation"></i> {{ jogo.dica }}</div>
-                    {% endif %}
-                </div>
-            </div>
-        {% endfor %}
-        </div>
-        <div class="d-grid pb-5 mt-3">
-            <button type="submit" class="btn btn-success btn-lg fw-bold shadow py-3 rounded-pill text-uppercase"><i class="fa-solid fa-wand-magic-sparkles me-2"></i> Calcular Palpites</button>
-        </div>
-    </form>
-</div>
-<script>
-document.addEventListener("DOMContentLoaded", () => { for(let i=1; i<=14; i++) { visUpd(i, 'p1'); visUpd(i, 'px'); visUpd(i, 'p2'); } });
-function visUpd(id, type) {
-    let s = type==='p1'?'1':type==='px'?'x':'2';
-    let val = document.getElementById('r'+s+'_'+id).value;
-    document.getElementById('bar'+s+'_'+id).style.height = val+'%';
-    document.getElementById('thumb'+s+'_'+id).style.bottom = val+'%';
-    document.getElementById('thumb'+s+'_'+id).innerText = val;
-}
-function upd(id, type) {
-    let el1=document.getElementById('r1_'+id), elx=document.getElementById('rx_'+id), el2=document.getElementById('r2_'+id);
-    let v1=parseInt(el1.value), vx=parseInt(elx.value), v2=parseInt(el2.value);
-    let changed = parseInt(document.getElementById(type.replace('p1','r1').replace('px','rx').replace('p2','r2')+'_'+id).value);
-    let resto = 100 - changed;
-    if(resto<=0) {
-        if(type==='p1'){elx.value=0;el2.value=0} if(type==='px'){el1.value=0;el2.value=0} if(type==='p2'){el1.value=0;elx.value=0}
-    } else {
-        let tot = (type==='p1'?vx+v2 : type==='px'?v1+v2 : v1+vx);
-        if(tot===0) {
-            let m = Math.floor(resto/2);
-            if(type==='p1'){elx.value=m;el2.value=resto-m} if(type==='px'){el1.value=m;el2.value=resto-m} if(type==='p2'){el1.value=m;elx.value=resto-m}
-        } else {
-            if(type==='p1'){elx.value=Math.round((vx/tot)*resto);el2.value=resto-parseInt(elx.value)}
-            if(type==='px'){el1.value=Math.round((v1/tot)*resto);el2.value=resto-parseInt(el1.value)}
-            if(type==='p2'){el1.value=Math.round((v1/tot)*resto);elx.value=resto-parseInt(el1.value)}
-        }
-    }
-    visUpd(id,'p1');visUpd(id,'px');visUpd(id,'p2');
-}
-</script>
-</body>
-</html>
-"""
-
-HTML_RESULTADO = """
-<!doctype html>
-<html lang="pt-br" data-bs-theme="dark">
-<head>
-    <meta charset="utf-8"> <meta name="viewport" content="width=device-width, initial-scale=1">
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-    <style>
-        body { background: #121212; color: #eee; font-family: 'Segoe UI'; }
-        .tag { padding: 8px; border-radius: 8px; font-weight: 800; display: block; width: 100%; font-size: 0.9rem; text-transform: uppercase; letter-spacing: 1px; color: #000; }
-        .card { background: #1e1e1e; border: 1px solid #333; }
-        .table-dark-custom { --bs-table-bg: #1e1e1e; --bs-table-color: #eee; --bs-table-border-color: #333; }
-    </style>
-</head>
-<body>
-<div class="container py-4">
-    <div class="card shadow border-0" style="border-radius:16px; overflow:hidden;">
-        <div class="card-header bg-success text-white text-center py-4">
-            <h3 class="mb-0 fw-bold"><i class="fa-solid fa-check-circle me-2"></i>Palpites Gerados</h3>
-            <div class="badge bg-dark mt-2 px-3 py-2 fs-6 border border-secondary">
-                {{ modo }} • Custo Estimado: R$ {{ "%.2f"|format(valor)|replace('.', ',') }}
-            </div>
-        </div>
-        <div class="card-body p-0">
-            <div class="table-responsive">
-                <table class="table table-dark-custom table-hover text-center align-middle mb-0">
-                    <thead class="table-secondary small text-dark"><tr><th>#</th><th>Jogo</th><th>Probabilidades</th><th>Palpite Final</th></tr></thead>
-                    <tbody>
-                        {% for i, row in df.iterrows() %}
-                        <tr>
-                            <td class="fw-bold text-secondary">{{ row['Jogo'] }}</td>
-                            <td><div class="small fw-bold">{{ row['Mandante'] }}<br><span class="text-secondary" style="font-size:0.7rem;">x</span><br>{{ row['Visitante'] }}</div></td>
-                            <td style="width: 30%;">
-                                <div class="progress" style="height:8px; border-radius:4px; background: #333;">
-                                    <div class="progress-bar bg-success" style="width:{{ row['Prob_Casa'] }}%"></div>
-                                    <div class="progress-bar bg-warning" style="width:{{ row['Prob_Empate'] }}%"></div>
-                                    <div class="progress-bar bg-danger" style="width:{{ row['Prob_Fora'] }}%"></div>
-                                </div>
-                                <div class="d-flex justify-content-between mt-1" style="font-size: 0.65rem; color:#aaa;">
-                                    <span>{{ row['Prob_Casa']|int }}%</span><span>{{ row['Prob_Empate']|int }}%</span><span>{{ row['Prob_Fora']|int }}%</span>
-                                </div>
-                            </td>
-                            <td><span class="{{ row['Classe_CSS'] }} tag shadow-sm">{{ row['Palpite IA'] }}</span></td>
-                        </tr>
-                        {% endfor %}
-                    </tbody>
-                </table>
-            </div>
-        </div>
-        <div class="card-footer p-3 bg-dark border-top border-secondary">
-            <a href="/" class="btn btn-outline-light w-100 fw-bold rounded-pill"><i class="fa-solid fa-rotate-left me-2"></i> Refazer Palpites</a>
-        </div>
-    </div>
-</div>
-</body>
-</html>
-"""
+
+    return render_template('manual.html', jogos=lista_jogos_sliders, modo=modo, configs=CONFIG_APOSTAS, fonte=fonte,
+                                  atualizando=status.get("estado") == "em_andamento", status=status,
+                                  modo_otimizado=MODO_OTIMIZADO, objetivos=OBJETIVOS_OTIMIZACAO)
 
 if __name__ == '__main__':
-    app.run(debug=True, port=10000)
+    # Só para desenvolvimento (LOTECA_DEBUG=1 liga o reloader/debugger); em produção: gunicorn -c gunicorn.conf.py app:app
+    app.run(debug=os.environ.get('LOTECA_DEBUG') == '1', port=int(os.environ.get('PORT', 10000)), threaded=True)
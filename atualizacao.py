@@ -0,0 +1,100 @@
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows (desenvolvimento local): fica só a trava do processo
+    fcntl = None
+
+# Atualização em segundo plano: a coleta roda numa thread fora da requisição,
+# com trava de arquivo para que só um worker do gunicorn colete por vez
+# (single-flight) e um arquivo de status que todos os workers enxergam.
+
+ARQUIVO_STATUS = 'status_coleta.json'
+ARQUIVO_TRAVA = 'coleta.lock'
+INTERVALO_ATUALIZACAO = int(os.environ.get('LOTECA_INTERVALO_ATUALIZACAO', 3600))  # 0 desliga o agendador
+TEMPO_MAXIMO_COLETA = 120  # status "em andamento" mais velho que isso é considerado travado
+
+_trava_local = threading.Lock()
+_trava_agendador = threading.Lock()  # a _trava_local fica presa durante a coleta; esta só guarda o início do agendador
+_agendador = None
+
+# --- 1. STATUS COMPARTILHADO ---
+def ler_status():
+    try:
+        with open(ARQUIVO_STATUS, 'r', encoding='utf-8') as f:
+            status = json.load(f)
+    except (OSError, ValueError):
+        return {"estado": "ocioso"}
+    if status.get("estado") == "em_andamento" and time.time() - status.get("inicio", 0) > TEMPO_MAXIMO_COLETA:
+        status["estado"] = "interrompido"
+    return status
+
+def _gravar_status(**campos):
+    status = ler_status()
+    status.update(campos)
+    temporario = f"{ARQUIVO_STATUS}.{os.getpid()}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(status, f, ensure_ascii=False)
+    os.replace(temporario, ARQUIVO_STATUS)
+
+def em_andamento():
+    return ler_status().get("estado") == "em_andamento"
+
+# --- 2. EXECUÇÃO SINGLE-FLIGHT ---
+def _travar_arquivo():
+    if fcntl is None:
+        return True, None
+    arquivo = open(ARQUIVO_TRAVA, 'w')
+    try:
+        fcntl.flock(arquivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True, arquivo
+    except OSError:
+        arquivo.close()
+        return False, None
+
+def _executar(arquivo):
+    try:
+        from coleta import executar_coleta
+        executar_coleta()
+        _gravar_status(estado="ocioso", fim=time.time(), ultima_atualizacao=datetime.now().isoformat(timespec='seconds'))
+    except Exception as e:
+        _gravar_status(estado="erro", fim=time.time(), erro=str(e))
+    finally:
+        if arquivo is not None:
+            arquivo.close()
+        _trava_local.release()
+
+def solicitar_atualizacao(motivo="manual"):
+    # Dispara a coleta sem bloquear; devolve False se já existe uma em andamento
+    if em_andamento() or not _trava_local.acquire(blocking=False):
+        return False
+    ok, arquivo = _travar_arquivo()
+    if not ok:  # outro worker já está coletando
+        _trava_local.release()
+        return False
+    _gravar_status(estado="em_andamento", motivo=motivo, inicio=time.time(), pid=os.getpid(), erro=None)
+    threading.Thread(target=_executar, args=(arquivo,), name="atualizacao", daemon=True).start()
+    return True
+
+# --- 3. AGENDADOR PERIÓDICO ---
+def _laco_agendador(intervalo):
+    while True:
+        # Espalha os workers para não baterem na trava ao mesmo tempo
+        time.sleep(intervalo * random.uniform(0.9, 1.1))
+        if time.time() - ler_status().get("fim", 0) >= intervalo:
+            solicitar_atualizacao(motivo="agendada")
+
+def iniciar_agendador(intervalo=INTERVALO_ATUALIZACAO):
+    global _agendador
+    if intervalo <= 0 or _agendador is not None:
+        return
+    with _trava_agendador:  # workers gthread: duas requisições podem chegar aqui juntas
+        if _agendador is not None:
+            return
+        _agendador = threading.Thread(target=_laco_agendador, args=(intervalo,), name="agendador", daemon=True)
+        _agendador.start()
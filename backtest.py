@@ -0,0 +1,185 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from motor import NUM_JOGOS, RESULTADOS, matriz_probabilidades, coberturas_das_estrategias, custo_aposta
+
+# Backtest das estratégias sobre concursos passados: replay com os resultados reais
+# e Monte Carlo sorteando resultados a partir das probabilidades de cada concurso.
+# O sorteio é vetorizado e dividido em blocos entre processos (um por núcleo).
+
+# Rateio médio estimado por aposta simples premiada (ajustável na linha de comando)
+PREMIO_14_PADRAO = 150000.00
+PREMIO_13_PADRAO = 600.00
+TAMANHO_BLOCO = 20000  # sorteios por bloco de trabalho
+
+# --- 1. ARQUIVO DE CONCURSOS ---
+def carregar_arquivo(caminho):
+    # JSON com lista de concursos, JSON Lines (um concurso por linha) ou o histórico SQLite. Cada concurso:
+    # {"concurso": 1100, "jogos": [{"Jogo", "Mandante", "Visitante", "Prob_Casa", "Prob_Empate", "Prob_Fora", "Resultado"}]}
+    if caminho.endswith(('.db', '.sqlite')):
+        import historico
+        return historico.concursos_para_backtest(caminho)
+    with open(caminho, 'r', encoding='utf-8') as f:
+        if caminho.endswith('.jsonl'):
+            return [json.loads(linha) for linha in f if linha.strip()]
+        return json.load(f)
+
+def preparar(concursos):
+    concursos = [c for c in concursos if len(c['jogos']) == NUM_JOGOS]
+    probs = matriz_probabilidades(np.array([[[j['Prob_Casa'], j['Prob_Empate'], j['Prob_Fora']]
+                                             for j in sorted(c['jogos'], key=lambda j: j['Jogo'])] for c in concursos], dtype=float))
+    resultados = np.array([[RESULTADOS.index(j['Resultado']) if j.get('Resultado') in RESULTADOS else -1
+                            for j in sorted(c['jogos'], key=lambda j: j['Jogo'])] for c in concursos], dtype=np.int8)
+    return probs, resultados
+
+def gerar_arquivo_sintetico(n, semente=0):
+    rng = np.random.default_rng(semente)
+    probs = rng.dirichlet([2.0, 1.3, 1.3], size=(n, NUM_JOGOS)) * 100
+    concursos = []
+    for c in range(n):
+        sorteio = [rng.choice(3, p=p / p.sum()) for p in probs[c]]
+        concursos.append({"concurso": 1000 + c, "jogos": [
+            {"Jogo": i + 1, "Mandante": f"CASA {i + 1}", "Visitante": f"FORA {i + 1}",
+             "Prob_Casa": float(probs[c, i, 0]), "Prob_Empate": float(probs[c, i, 1]), "Prob_Fora": float(probs[c, i, 2]),
+             "Resultado": RESULTADOS[sorteio[i]]} for i in range(NUM_JOGOS)]})
+    return concursos
+
+# --- 2. PREMIAÇÃO ---
+def posicoes_resultados(probs):
+    # posicao[..., r] = lugar do resultado r na ordem de favoritismo (0 = favorito)
+    return np.argsort(np.argsort(-probs, axis=-1, kind='stable'), axis=-1, kind='stable')
+
+def apurar(acertou, coberturas, premio14, premio13):
+    # acertou: (..., 14) bool; coberturas: (..., 14). Um bilhete com duplos/triplos vale
+    # várias apostas simples: com 14 acertos leva 1 prêmio de 14 e (soma das coberturas - 14)
+    # de 13; com 13, o jogo errado rende tantas simples de 13 quanto sua cobertura.
+    acertos = acertou.sum(axis=-1)
+    cob = coberturas.astype(np.int64)
+    premio = np.where(acertos == 14, premio14 + (cob.sum(axis=-1) - NUM_JOGOS) * premio13, 0.0)
+    errado = np.where(acertou, 0, cob).sum(axis=-1)
+    premio = premio + np.where(acertos == 13, errado * premio13, 0.0)
+    return acertos, premio
+
+# --- 3. MONTE CARLO (EXECUTADO NOS PROCESSOS) ---
+def _simular_bloco(probs, posicoes, coberturas, n, semente, premio14, premio13):
+    # probs/posicoes: (N, 14, 3); coberturas: (N, M, 14). Devolve histograma (M, 15) e prêmio total (M,)
+    rng = np.random.default_rng(semente)
+    acumulado = np.cumsum(probs, axis=-1)
+    acumulado[..., -1] = 1.0
+    sorteio = (rng.random((n,) + probs.shape[:-1] + (1,)) > acumulado[None]).sum(axis=-1)  # (n, N, 14)
+    posicao = np.take_along_axis(posicoes[None], sorteio[..., None], axis=-1)[..., 0]
+    acertou = posicao[:, :, None, :] < coberturas[None]  # (n, N, M, 14)
+    acertos, premio = apurar(acertou, coberturas[None], premio14, premio13)
+    m = coberturas.shape[1]
+    histograma = np.zeros((m, NUM_JOGOS + 1), dtype=np.int64)
+    for e in range(m):
+        histograma[e] = np.bincount(acertos[:, :, e].ravel(), minlength=NUM_JOGOS + 1)
+    return histograma, premio.sum(axis=(0, 1))
+
+def simular(probs, coberturas, simulacoes, processos=None, semente=0, premio14=PREMIO_14_PADRAO, premio13=PREMIO_13_PADRAO,
+            probs_decisao=None):
+    # simulacoes = sorteios de cada concurso; cada sorteio avalia os M bilhetes do concurso
+    posicoes = posicoes_resultados(probs_decisao if probs_decisao is not None else probs)
+    por_bloco = max(1, TAMANHO_BLOCO // max(1, probs.shape[0]))
+    tamanhos = [por_bloco] * (simulacoes // por_bloco) + ([simulacoes % por_bloco] if simulacoes % por_bloco else [])
+    sementes = np.random.SeedSequence(semente).spawn(len(tamanhos))
+    histograma = np.zeros((coberturas.shape[1], NUM_JOGOS + 1), dtype=np.int64)
+    premio = np.zeros(coberturas.shape[1])
+    processos = processos or os.cpu_count() or 1
+    if processos == 1:
+        partes = (_simular_bloco(probs, posicoes, coberturas, n, s, premio14, premio13) for n, s in zip(tamanhos, sementes))
+        for h, p in partes:
+            histograma += h
+            premio += p
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            futuros = [executor.submit(_simular_bloco, probs, posicoes, coberturas, n, s, premio14, premio13)
+                       for n, s in zip(tamanhos, sementes)]
+            for futuro in futuros:
+                h, p = futuro.result()
+                histograma += h
+                premio += p
+    return histograma, premio
+
+# --- 4. BACKTEST COMPLETO ---
+def executar_backtest(concursos, estrategias, simulacoes=10000, processos=None, semente=0,
+                      premio14=PREMIO_14_PADRAO, premio13=PREMIO_13_PADRAO, priors=None):
+    # estrategias: {nome: {"duplos", "triplos", ...}} (formato do CONFIG_APOSTAS).
+    # priors (14, 3): se informado, as coberturas são decididas por ele em vez das
+    # probabilidades do concurso, que continuam sendo a "verdade" do sorteio.
+    probs, resultados = preparar(concursos)
+    nomes = list(estrategias)
+    pares = [(estrategias[n]['duplos'], estrategias[n]['triplos']) for n in nomes]
+    probs_decisao = probs if priors is None else np.broadcast_to(matriz_probabilidades(np.asarray(priors, dtype=float)), probs.shape)
+    coberturas = coberturas_das_estrategias(probs_decisao, pares)
+    custos = np.array([custo_aposta(d, t) for d, t in pares])
+
+    # Replay com os resultados reais (concursos sem resultado ficam de fora)
+    com_resultado = (resultados >= 0).all(axis=1)
+    posicoes = posicoes_resultados(probs_decisao)
+    reais = np.take_along_axis(posicoes[com_resultado], resultados[com_resultado].astype(np.intp)[..., None], axis=-1)[..., 0]
+    acertos_reais, premio_real = apurar(reais[:, None, :] < coberturas[com_resultado], coberturas[com_resultado], premio14, premio13)
+
+    inicio = time.perf_counter()
+    histograma, premio_sim = simular(probs, coberturas, simulacoes, processos, semente, premio14, premio13, probs_decisao)
+    decorrido = time.perf_counter() - inicio
+    bilhetes = simulacoes * probs.shape[0] * len(nomes)
+
+    n_reais = int(com_resultado.sum())
+    relatorio = {"concursos": probs.shape[0], "concursos_com_resultado": n_reais, "simulacoes": simulacoes,
+                 "bilhetes_simulados": bilhetes, "segundos": decorrido,
+                 "segundos_por_milhao": decorrido / bilhetes * 1e6 if bilhetes else 0.0, "estrategias": {}}
+    for e, nome in enumerate(nomes):
+        gasto_sim = custos[e] * simulacoes * probs.shape[0]
+        gasto_real = custos[e] * n_reais
+        relatorio["estrategias"][nome] = {
+            "custo": float(custos[e]),
+            "roi_simulado": float((premio_sim[e] - gasto_sim) / gasto_sim) if gasto_sim else 0.0,
+            "histograma_simulado": histograma[e].tolist(),
+            "roi_real": float((premio_real[:, e].sum() - gasto_real) / gasto_real) if gasto_real else None,
+            "histograma_real": np.bincount(acertos_reais[:, e], minlength=NUM_JOGOS + 1).tolist() if n_reais else None,
+        }
+    return relatorio
+
+def imprimir_relatorio(relatorio, titulo):
+    print(f"\n=== {titulo} ===")
+    print(f"{relatorio['concursos']} concursos ({relatorio['concursos_com_resultado']} com resultado), "
+          f"{relatorio['bilhetes_simulados']:,} bilhetes simulados em {relatorio['segundos']:.2f} s "
+          f"({relatorio['segundos_por_milhao']:.3f} s por milhão)")
+    for nome, r in relatorio["estrategias"].items():
+        hist = np.array(r['histograma_simulado'], dtype=float)
+        hist /= hist.sum() or 1
+        real = "-" if r['roi_real'] is None else f"{r['roi_real'] * 100:+.1f}%"
+        print(f"{nome:<20} R$ {r['custo']:>8.2f}  ROI simulado {r['roi_simulado'] * 100:+8.1f}%  ROI real {real:>8}  "
+              f"P(13) {hist[13] * 100:.4f}%  P(14) {hist[14] * 100:.5f}%")
+
+if __name__ == "__main__":
+    from app import CONFIG_APOSTAS, DEFAULTS_GABARITO
+
+    parser = argparse.ArgumentParser(description="Backtest das estratégias da Loteca Pro IA")
+    parser.add_argument("arquivo", nargs="?", help="arquivo .json/.jsonl ou histórico .db com concursos passados")
+    parser.add_argument("--sintetico", type=int, default=0, help="gera N concursos sintéticos em vez de ler arquivo")
+    parser.add_argument("--simulacoes", type=int, default=10000, help="sorteios Monte Carlo por concurso")
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--premio14", type=float, default=PREMIO_14_PADRAO)
+    parser.add_argument("--premio13", type=float, default=PREMIO_13_PADRAO)
+    args = parser.parse_args()
+
+    if args.arquivo:
+        concursos = carregar_arquivo(args.arquivo)
+    elif args.sintetico:
+        concursos = gerar_arquivo_sintetico(args.sintetico, args.semente)
+    else:
+        parser.error("informe um arquivo ou --sintetico N")
+
+    opcoes = dict(simulacoes=args.simulacoes, processos=args.processos, semente=args.semente,
+                  premio14=args.premio14, premio13=args.premio13)
+    imprimir_relatorio(executar_backtest(concursos, CONFIG_APOSTAS, **opcoes), "Risco calculado pelas probabilidades do concurso")
+    priors = [[DEFAULTS_GABARITO[i]['p1'], DEFAULTS_GABARITO[i]['px'], DEFAULTS_GABARITO[i]['p2']] for i in range(1, NUM_JOGOS + 1)]
+    imprimir_relatorio(executar_backtest(concursos, CONFIG_APOSTAS, priors=priors, **opcoes), "Coberturas decididas pelo DEFAULTS_GABARITO")
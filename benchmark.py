@@ -0,0 +1,646 @@
+import itertools
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from motor import (matriz_probabilidades, probabilidade_acerto_por_jogo, distribuicao_acertos, resumo_premios,
+                   otimizar_cobertura, _ganhos, VALOR_APOSTA_SIMPLES, processar_lote)
+
+# Benchmarks e conferências de correção. Uso: python benchmark.py [nome ...]
+
+def _probs_aleatorias(n, semente=0):
+    rng = np.random.default_rng(semente)
+    return matriz_probabilidades(rng.dirichlet([2, 1.5, 1.5], size=(n, 14)))
+
+def _cronometrar(func, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        func()
+    return (time.perf_counter() - inicio) / repeticoes
+
+# --- 1. MOTOR DE PROBABILIDADES ---
+def bench_motor():
+    probs = _probs_aleatorias(1)[0]
+    coberturas = np.array([1] * 8 + [2] * 3 + [3] * 3)
+
+    # Conferência contra a força bruta: enumera os 2^14 padrões de acerto/erro
+    q = probabilidade_acerto_por_jogo(probs, coberturas)
+    bruta = np.zeros(15)
+    for acertos in itertools.product((0, 1), repeat=14):
+        a = np.array(acertos)
+        bruta[a.sum()] += np.prod(np.where(a == 1, q, 1 - q))
+    assert np.allclose(bruta, distribuicao_acertos(q)), "distribuição diverge da força bruta"
+
+    t = _cronometrar(lambda: resumo_premios(probs, coberturas), 2000)
+    print(f"motor: 1 bilhete em {t * 1e6:.1f} µs")
+
+    lote = _probs_aleatorias(10000)
+    cob_lote = np.random.default_rng(1).integers(1, 4, size=(10000, 14))
+    t = _cronometrar(lambda: resumo_premios(lote, cob_lote), 10)
+    print(f"motor: 10000 bilhetes em {t * 1e3:.1f} ms ({t / 10000 * 1e6:.2f} µs/bilhete)")
+
+# --- 2. OTIMIZADOR POR ORÇAMENTO ---
+def _otimizar_exaustivo(probs, orcamento, objetivo):
+    # Percorre as 3^14 coberturas possíveis em blocos de 3^10
+    ganhos = _ganhos(probs, objetivo)
+    bloco = 3 ** 10
+    digitos_baixos = (np.arange(bloco)[:, None] // 3 ** np.arange(10)) % 3
+    melhor, melhor_custo = -np.inf, np.inf
+    for alto in range(3 ** 4):
+        digitos_altos = (alto // 3 ** np.arange(4)) % 3
+        digitos = np.hstack([digitos_baixos, np.broadcast_to(digitos_altos, (bloco, 4))])
+        custos = VALOR_APOSTA_SIMPLES * 2.0 ** (digitos == 1).sum(1) * 3.0 ** (digitos == 2).sum(1)
+        valores = ganhos[np.arange(14), digitos].sum(1)
+        valores[custos > orcamento + 1e-9] = -np.inf
+        i = np.argmax(valores)
+        if valores[i] > melhor + 1e-12 or (abs(valores[i] - melhor) <= 1e-12 and custos[i] < melhor_custo):
+            melhor, melhor_custo = valores[i], custos[i]
+    return melhor, melhor_custo
+
+def bench_otimizador():
+    orcamentos = [2, 4, 16, 50, 200, 1458, 1728, 10000]
+    for semente, probs in enumerate(_probs_aleatorias(3, semente=7)):
+        for objetivo in ("p14", "esperado"):
+            for orcamento in orcamentos:
+                res = otimizar_cobertura(probs, orcamento, objetivo)
+                valor = _ganhos(probs, objetivo)[np.arange(14), res['coberturas'] - 1].sum()
+                melhor, _ = _otimizar_exaustivo(probs, orcamento, objetivo)
+                assert res['valor'] <= orcamento and abs(valor - melhor) < 1e-9, (semente, objetivo, orcamento)
+    print(f"otimizador: confere com a busca exaustiva (3^14) em {3 * 2 * len(orcamentos)} casos")
+
+    probs = _probs_aleatorias(1)[0]
+    for orcamento in (16, 1728, 100000):
+        t = _cronometrar(lambda: otimizar_cobertura(probs, orcamento), 500)
+        print(f"otimizador: orçamento R$ {orcamento} em {t * 1e3:.3f} ms")
+
+# --- 3. LOTE DE CONCURSOS ---
+def bench_lote():
+    from app import CONFIG_APOSTAS, aplicar_estrategia, calcular_chances
+
+    probs = _probs_aleatorias(500) * 100
+    estrategias = [(c['duplos'], c['triplos']) for c in CONFIG_APOSTAS.values()]
+    concursos = [[{"Jogo": i + 1, "Mandante": "", "Visitante": "", "Prob_Casa": p[i, 0], "Prob_Empate": p[i, 1], "Prob_Fora": p[i, 2]}
+                  for i in range(14)] for p in probs]
+
+    def um_a_um():
+        for jogos in concursos:
+            for nome in CONFIG_APOSTAS:
+                calcular_chances(aplicar_estrategia(jogos, nome))
+
+    t_antigo = _cronometrar(um_a_um, 1)
+    t_lote = _cronometrar(lambda: processar_lote(probs, estrategias), 5)
+    print(f"lote: 500 concursos x {len(estrategias)} estratégias — um a um {t_antigo:.2f} s, vetorizado {t_lote * 1e3:.1f} ms")
+
+# --- 4. NÚCLEO DA ESTRATÉGIA (ANTES x DEPOIS) ---
+# Cópia da implementação antiga em pandas, mantida só como referência de comparação
+def _gerar_palpite_pandas(p1, px, p2, tipo):
+    probs = {'1': p1, 'X': px, '2': p2}
+    ordenado = sorted(probs.items(), key=lambda x: x[1], reverse=True)
+    fav, vice = ordenado[0][0], ordenado[1][0]
+    if tipo == "TRIPLO":
+        return "TRIPLO (1 X 2)", "bg-primary text-white border-primary"
+    elif tipo == "DUPLO":
+        palpite = "".join(sorted([fav, vice])).replace('12', '1 2')
+        return f"DUPLO {palpite}", "bg-warning text-dark border-warning"
+    else:
+        return f"COLUNA {fav}", "bg-success text-white border-success"
+
+def _aplicar_estrategia_pandas(df, config):
+    df['Risco'] = 100 - df[['Prob_Casa', 'Prob_Empate', 'Prob_Fora']].max(axis=1)
+    df_sorted = df.sort_values(by='Risco', ascending=False)
+    ind_triplos = df_sorted.head(config['triplos']).index
+    restante = df_sorted.drop(ind_triplos)
+    ind_duplos = restante.head(config['duplos']).index
+    palpites, classes = [], []
+    for idx in df.index:
+        tipo = "TRIPLO" if idx in ind_triplos else "DUPLO" if idx in ind_duplos else "SECO"
+        txt, css = _gerar_palpite_pandas(df.at[idx, 'Prob_Casa'], df.at[idx, 'Prob_Empate'], df.at[idx, 'Prob_Fora'], tipo)
+        palpites.append(txt)
+        classes.append(css)
+    df['Palpite IA'] = palpites
+    df['Classe_CSS'] = classes
+    return df.sort_values(by='Jogo')
+
+def _medir(func, repeticoes):
+    # Latência média e pico de memória alocada numa chamada
+    import tracemalloc
+    func()
+    t = _cronometrar(func, repeticoes)
+    tracemalloc.start()
+    func()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return t, pico
+
+def _jogos_gabarito():
+    # Os 14 jogos do DEFAULTS_GABARITO no formato das linhas do app
+    from app import DEFAULTS_GABARITO
+    return [{"Jogo": i, "Mandante": f"CASA {i}", "Visitante": f"FORA {i}", "Prob_Casa": g['p1'], "Prob_Empate": g['px'], "Prob_Fora": g['p2']}
+            for i, g in DEFAULTS_GABARITO.items()]
+
+def _formulario(jogos, modo):
+    form = {'modo_selecionado': modo}
+    for j in jogos:
+        i = j['Jogo']
+        form.update({f'time1_{i}': j['Mandante'], f'time2_{i}': j['Visitante'],
+                     f'range1_{i}': j['Prob_Casa'], f'rangex_{i}': j['Prob_Empate'], f'range2_{i}': j['Prob_Fora']})
+    return form
+
+def bench_estrategia():
+    from app import app, CONFIG_APOSTAS, aplicar_estrategia, gerar_palpite
+
+    jogos = _jogos_gabarito()
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None
+
+    if pd is not None:
+        # Conferência: mesmos palpites da versão antiga, inclusive em empates de risco
+        rng = np.random.default_rng(5)
+        for _ in range(200):
+            p = rng.integers(0, 10, size=(14, 3)) * 10 + 1
+            amostra = [dict(j, Prob_Casa=int(a), Prob_Empate=int(b), Prob_Fora=int(c)) for j, (a, b, c) in zip(jogos, p)]
+            for config in CONFIG_APOSTAS.values():
+                nome = next(n for n, c in CONFIG_APOSTAS.items() if c is config)
+                antigo = _aplicar_estrategia_pandas(pd.DataFrame(amostra), config)['Palpite IA'].tolist()
+                assert antigo == [j['Palpite IA'] for j in aplicar_estrategia(amostra, nome)], nome
+
+    casos = [("gerar_palpite", lambda: gerar_palpite(50, 30, 20, "DUPLO"), lambda: _gerar_palpite_pandas(50, 30, 20, "DUPLO"), 20000),
+             ("aplicar_estrategia", lambda: aplicar_estrategia(jogos, "Magnata"),
+              lambda: _aplicar_estrategia_pandas(pd.DataFrame(jogos), CONFIG_APOSTAS["Magnata"]), 300)]
+    cliente, form = app.test_client(), _formulario(jogos, "Magnata")
+    from cache import resultados
+
+    def post_pandas():
+        # Caminho antigo do POST /: formulário -> DataFrame -> estratégia pandas -> render.
+        # Roda num contexto de requisição (sem o cliente WSGI), então o "antes" sai até um pouco otimista
+        from flask import render_template, request
+        from motor import coberturas_dos_tipos
+        with app.test_request_context('/', method='POST', data=form):
+            modo = request.form.get('modo_selecionado')
+            dados_form = []
+            for i in range(1, 15):
+                p1, px, p2 = (float(request.form.get(f'{c}_{i}')) for c in ('range1', 'rangex', 'range2'))
+                total = (p1 + px + p2) or 1
+                dados_form.append({"Jogo": i, "Mandante": request.form.get(f'time1_{i}'), "Visitante": request.form.get(f'time2_{i}'),
+                                   "Prob_Casa": p1 / total * 100, "Prob_Empate": px / total * 100, "Prob_Fora": p2 / total * 100})
+            df = _aplicar_estrategia_pandas(pd.DataFrame(dados_form), CONFIG_APOSTAS[modo])
+            # Chances como o calcular_chances da época (sobre o DataFrame)
+            tipos = df['Palpite IA'].str.split().str[0].replace('COLUNA', 'SECO')
+            resumo = resumo_premios(matriz_probabilidades(df[['Prob_Casa', 'Prob_Empate', 'Prob_Fora']].to_numpy()), coberturas_dos_tipos(tipos))
+            chances = {"p14": float(resumo['p14']) * 100, "p13": float(resumo['p13']) * 100, "esperado": float(resumo['esperado'])}
+            valor = CONFIG_APOSTAS[modo]['valor']
+            return render_template('resultado.html', jogos=df.to_dict('records'), modo=modo, valor=valor, chances=chances,
+                                   apostas=round(valor / VALOR_APOSTA_SIMPLES))
+
+    if pd is not None:
+        resultados.limpar()
+        assert post_pandas() == cliente.post('/', data=form).get_data(as_text=True)
+    casos.append(("POST /", lambda: (resultados.limpar(), cliente.post('/', data=form)), post_pandas, 100))
+
+    for nome, depois, antes, repeticoes in casos:
+        t, pico = _medir(depois, repeticoes)
+        linha = f"estrategia: {nome:<20} depois {t * 1e6:9.1f} µs {pico / 1024:8.1f} KiB"
+        if antes is not None and pd is not None:
+            t, pico = _medir(antes, repeticoes)
+            linha += f" | antes (pandas) {t * 1e6:9.1f} µs {pico / 1024:8.1f} KiB"
+        print(linha)
+
+# --- 5. COLD START DO WORKER ---
+# Regressão de tempo de importação (python -X importtime). O caminho da estratégia
+# não pode puxar pandas nem as dependências de scraping.
+LIMITE_IMPORTACAO_MS = 300
+MODULOS_PROIBIDOS_NO_IMPORT = ("pandas", "cloudscraper", "bs4", "requests")
+
+def _tempos_importacao(modulo):
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                          capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    tempos = {}
+    for linha in proc.stderr.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, acumulado, nome = linha[len("import time:"):].split("|")
+        tempos[nome.strip()] = int(acumulado) / 1000
+    return tempos
+
+def bench_importacao():
+    medicoes = [_tempos_importacao("app") for _ in range(5)]
+    carregados = set().union(*medicoes)
+    proibidos = sorted({m.split(".")[0] for m in carregados} & set(MODULOS_PROIBIDOS_NO_IMPORT))
+    assert not proibidos, f"import app carregou: {', '.join(proibidos)}"
+
+    total = sorted(m["app"] for m in medicoes)[len(medicoes) // 2]
+    maiores = sorted(((t, n) for n, t in medicoes[-1].items() if "." not in n and n != "app"), reverse=True)[:5]
+    print(f"importacao: import app em {total:.1f} ms (mediana de 5, limite {LIMITE_IMPORTACAO_MS} ms)")
+    print("importacao: maiores dependências: " + ", ".join(f"{n} {t:.1f} ms" for t, n in maiores))
+    assert total <= LIMITE_IMPORTACAO_MS, f"import app levou {total:.1f} ms"
+
+# --- 6. COLETA CONCORRENTE (OFFLINE) ---
+PASTA_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+def servidor_local(rotas):
+    # Servidor HTTP de teste: rotas = {caminho: (arquivo em fixtures/, atraso em s, status)}.
+    # Responde com ETag e 304 a If-None-Match; servidor.contagem[(caminho, status)] conta as respostas
+    import hashlib
+    import threading
+    from collections import Counter
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    class Manipulador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            arquivo, atraso, status = rotas.get(self.path, (None, 0, 404))
+            time.sleep(atraso)
+            corpo = b""
+            if arquivo:
+                with open(os.path.join(PASTA_FIXTURES, arquivo), "rb") as f:
+                    corpo = f.read()
+            etag = '"%s"' % hashlib.sha1(corpo).hexdigest()
+            if status == 200 and self.headers.get("If-None-Match") == etag:
+                servidor.contagem[(self.path, 304)] += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            servidor.contagem[(self.path, status)] += 1
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(corpo)))
+            if status == 200:
+                self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Manipulador)
+    servidor.daemon_threads = True
+    servidor.contagem = Counter()
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}"
+
+def bench_coleta():
+    import functools
+    import tempfile
+    import coleta
+    from cache_http import CacheHTTP
+
+    cenarios = [
+        ("vovoteca lenta, caixa rápida", {"/v": ("vovoteca.html", 0.4, 200), "/c": ("caixa.html", 0.1, 200)}, "Vovoteca"),
+        ("vovoteca fora do ar", {"/v": (None, 0.3, 503), "/c": ("caixa.html", 0.4, 200)}, "Caixa"),
+        ("caixa pendurada", {"/v": ("vovoteca.html", 0.1, 200), "/c": ("caixa.html", 3.0, 200)}, "Vovoteca"),
+    ]
+    for nome, rotas, esperado in cenarios:
+        servidor, base = servidor_local(rotas)
+        with tempfile.TemporaryDirectory() as pasta:
+            cache = CacheHTTP(pasta)
+            fontes = [functools.partial(coleta.buscar_vovoteca, url=base + "/v", cache=cache),
+                      functools.partial(coleta.buscar_caixa, url=base + "/c", cache=cache)]
+            inicio = time.perf_counter()
+            dados, fonte, _ = coleta.coletar_fontes(fontes)
+            decorrido = time.perf_counter() - inicio
+        servidor.shutdown()
+        assert len(dados) == 14 and fonte.startswith(esperado), (nome, fonte)
+        print(f"coleta: {nome:<30} -> {fonte:<24} em {decorrido * 1e3:.0f} ms")
+
+# --- 7. PÁGINA INICIAL: CACHE HTTP ---
+def bench_pagina():
+    import app as modulo_app
+
+    cliente = modulo_app.app.test_client()
+    etag = cliente.get('/').headers['ETag']
+
+    def sem_cache():
+        modulo_app._cache_paginas.clear()
+        cliente.get('/')
+
+    casos = [
+        ("GET / renderizando sempre", sem_cache),
+        ("GET / com cache", lambda: cliente.get('/')),
+        ("GET / com cache + gzip", lambda: cliente.get('/', headers={'Accept-Encoding': 'gzip'})),
+        ("GET / 304 (If-None-Match)", lambda: cliente.get('/', headers={'If-None-Match': etag})),
+    ]
+    for nome, func in casos:
+        t = _cronometrar(func, 300)
+        print(f"pagina: {nome:<28} {1 / t:8.0f} req/s ({t * 1e3:.2f} ms)")
+
+# --- 8. CACHE DE RESULTADOS ---
+class RedisLocal(dict):
+    # Substituto local do Redis (só get/setex, sem expiração) para simular workers
+    def get(self, chave):
+        return dict.get(self, chave)
+
+    def setex(self, chave, validade, valor):
+        self[chave] = valor.encode('utf-8')
+
+class RedisForaDoAr:
+    # Cada chamada espera o socket_timeout do backend_do_ambiente (0,2 s) e falha
+    def get(self, chave):
+        time.sleep(0.2)
+        raise ConnectionError("Redis fora do ar")
+
+    def setex(self, chave, validade, valor):
+        time.sleep(0.2)
+        raise ConnectionError("Redis fora do ar")
+
+def bench_cache():
+    import app as modulo_app
+    from cache import CacheResultados, BackendRedis
+
+    jogos = _jogos_gabarito()
+    cliente = modulo_app.app.test_client()
+    formularios = [_formulario(jogos, modo) for modo in modulo_app.CONFIG_APOSTAS]
+
+    compartilhado = RedisLocal()
+    workers = [CacheResultados(backend=BackendRedis(compartilhado)) for _ in range(2)]
+    original = modulo_app.cache_resultados
+    try:
+        modulo_app.cache_resultados = workers[0]
+        falha = _cronometrar(lambda: (workers[0].limpar(), compartilhado.clear(), cliente.post('/', data=formularios[0])), 100)
+        acerto = _cronometrar(lambda: cliente.post('/', data=formularios[0]), 300)
+        print(f"cache: POST / falha {falha * 1e3:.2f} ms, acerto {acerto * 1e3:.2f} ms")
+
+        # Segundo worker aproveita o que o primeiro calculou
+        for form in formularios:
+            cliente.post('/', data=form)
+        modulo_app.cache_resultados = workers[1]
+        for form in formularios:
+            cliente.post('/', data=form)
+        print(f"cache: worker 2 após worker 1 -> {workers[1].estatisticas()}")
+
+        # Redis fora do ar: só a primeira requisição paga o timeout, as demais usam o cache local
+        modulo_app.cache_resultados = fora = CacheResultados(backend=BackendRedis(RedisForaDoAr()))
+        inicio = time.perf_counter()
+        for form in formularios * 4:
+            cliente.post('/', data=form)
+        decorrido = time.perf_counter() - inicio
+        print(f"cache: Redis fora do ar -> {len(formularios) * 4} POST / em {decorrido:.2f} s, "
+              f"{fora.estatisticas()['erros_backend']} erro(s) no backend")
+    finally:
+        modulo_app.cache_resultados = original
+
+# --- 9. HISTÓRICO SQLITE ---
+def bench_historico():
+    import tempfile
+    import historico
+    from backtest import gerar_arquivo_sintetico
+
+    # 10 anos: ~52 concursos por ano, 24 coletas por concurso
+    anos, coletas_por_concurso = 10, 24
+    concursos = gerar_arquivo_sintetico(anos * 52, semente=3)
+    times = [f"TIME {k}/UF" for k in range(300)]
+    rng = np.random.default_rng(3)
+    for c in concursos:
+        nomes = rng.choice(len(times), size=28, replace=False)
+        for j, jogo in enumerate(c['jogos']):
+            jogo['Mandante'], jogo['Visitante'] = times[nomes[2 * j]], times[nomes[2 * j + 1]]
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "historico.db")
+        lote = []
+        for n, c in enumerate(concursos):
+            for k in range(coletas_por_concurso):
+                ruido = [dict(j, Prob_Casa=j['Prob_Casa'] + rng.normal(0, 1)) for j in c['jogos']]
+                lote.append((ruido, "Sintético", c['concurso'], f"{2016 + n // 52}-{1 + n % 52:02d}-01T{k:02d}:00:00"))
+        inicio = time.perf_counter()
+        historico.registrar_coletas(lote, caminho)
+        historico.registrar_resultados([(c['concurso'], j['Jogo'], j['Resultado']) for c in concursos for j in c['jogos']], caminho)
+        decorrido = time.perf_counter() - inicio
+        print(f"historico: {len(lote):,} coletas / {len(lote) * 14:,} jogos inseridos em {decorrido:.2f} s "
+              f"({os.path.getsize(caminho) / 2 ** 20:.1f} MiB)")
+
+        consultas = [
+            ("jogos do time", lambda: historico.jogos_do_time(times[7], caminho=caminho), 200),
+            ("deriva de um jogo", lambda: historico.deriva_probabilidades(concursos[300]['concurso'], 5, caminho=caminho), 200),
+            ("exportar p/ backtest", lambda: historico.concursos_para_backtest(caminho), 3),
+        ]
+        for nome, func, repeticoes in consultas:
+            t = _cronometrar(func, repeticoes)
+            print(f"historico: {nome:<22} {t * 1e3:8.2f} ms ({len(func())} linhas)")
+
+# --- 10. LEITURA DO HTML ---
+# Cópia da leitura antiga com BeautifulSoup (árvore inteira + 14 x 3 buscas), só para comparação
+def _vovoteca_bs4(conteudo):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(conteudo, 'html.parser')
+    dados = []
+    for i in range(1, 15):
+        linha = soup.find('tr', id=f'tr-linha-{i}')
+        if not linha: continue
+        cols = linha.find_all('td')
+        if len(cols) < 6: continue
+        idx = i - 1
+        try:
+            p1 = float(soup.find('td', id=f'resultado-{idx}-home').text.strip().replace('%', '').replace(',', '.'))
+            p2 = float(soup.find('td', id=f'resultado-{idx}-away').text.strip().replace('%', '').replace(',', '.'))
+            px = 100 - (p1 + p2)
+        except Exception: p1, px, p2 = 33, 34, 33
+        dados.append({"Jogo": i, "Mandante": cols[1].text.strip(), "Visitante": cols[5].text.strip(), "Prob_Casa": p1, "Prob_Empate": px, "Prob_Fora": p2})
+    return dados
+
+def _caixa_bs4(conteudo):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(conteudo, 'html.parser')
+    dados = []
+    tabela = soup.find('table', class_='loteca')
+    for linha in tabela.find_all('tr'):
+        cols = linha.find_all('td')
+        if len(cols) >= 5 and cols[0].text.strip().isdigit():
+            mandante, visitante = cols[2].text.strip(), cols[4].text.strip()
+            if mandante and visitante:
+                dados.append({"Jogo": int(cols[0].text.strip()), "Mandante": mandante, "Visitante": visitante, "Prob_Casa": 33, "Prob_Empate": 34, "Prob_Fora": 33})
+    return dados
+
+def _inflar(conteudo, antes):
+    # Simula uma página real (menus, posts, comentários) com ~500 KiB ao redor da tabela
+    bloco = b"<div class='post'><a href='/x'>Enquete antiga</a><p>" + b"Texto de conteudo relacionado. " * 20 + b"</p></div>\n"
+    recheio = bloco * (500 * 1024 // len(bloco))
+    corpo = conteudo.index(b"<main>")
+    return conteudo[:corpo] + recheio + conteudo[corpo:] if antes else conteudo.replace(b"</main>", recheio + b"</main>")
+
+def bench_parser():
+    import tracemalloc
+    from leitores import ler_vovoteca, ler_caixa
+
+    with open(os.path.join(PASTA_FIXTURES, "vovoteca.html"), "rb") as f:
+        vovoteca = f.read()
+    with open(os.path.join(PASTA_FIXTURES, "caixa.html"), "rb") as f:
+        caixa = f.read()
+    casos = [
+        ("vovoteca (fixture)", vovoteca, _vovoteca_bs4, ler_vovoteca),
+        ("vovoteca +500K depois", _inflar(vovoteca, antes=False), _vovoteca_bs4, ler_vovoteca),
+        ("vovoteca +500K antes", _inflar(vovoteca, antes=True), _vovoteca_bs4, ler_vovoteca),
+        ("caixa (fixture)", caixa, _caixa_bs4, ler_caixa),
+    ]
+    for nome, conteudo, antigo, novo in casos:
+        # Mesma chamada da coleta: o corpo inteiro (bytes) vindo do cache HTTP
+        assert antigo(conteudo) == novo(conteudo), nome
+        linha = f"parser: {nome:<24} {len(conteudo) / 1024:6.0f} KiB |"
+        for rotulo, func in (("bs4", lambda: antigo(conteudo)), ("streaming", lambda: novo(conteudo))):
+            t = _cronometrar(func, 5)
+            tracemalloc.start()
+            func()
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            linha += f" {rotulo} {t * 1e3:7.2f} ms {pico / 1024:7.0f} KiB |"
+        print(linha)
+
+# --- 11. CACHE HTTP DAS FONTES ---
+def bench_cache_http():
+    import functools
+    import tempfile
+    import coleta
+    import historico
+    from cache_http import CacheHTTP
+    from dados import RepositorioJogos
+
+    with tempfile.TemporaryDirectory() as pasta:
+        with open(os.path.join(PASTA_FIXTURES, "vovoteca.html"), "rb") as f:
+            alterada = f.read().replace(b"</main>", b"<p>Enquete atualizada</p></main>")
+        with open(os.path.join(pasta, "vovoteca_alterada.html"), "wb") as f:
+            f.write(alterada)
+
+        rotas = {"/v": ("vovoteca.html", 0.05, 200), "/c": ("caixa.html", 0.05, 200)}
+        servidor, base = servidor_local(rotas)
+        cache = CacheHTTP(os.path.join(pasta, "cache_http"))
+        frescor = {"valor": 0}
+
+        def fontes():
+            return [functools.partial(coleta.buscar_vovoteca, url=base + "/v", cache=cache, frescor=frescor["valor"]),
+                    functools.partial(coleta.buscar_caixa, url=base + "/c", cache=cache, frescor=frescor["valor"])]
+
+        originais = coleta.FONTES, coleta.repositorio, historico.ARQUIVO_HISTORICO
+        repositorio = RepositorioJogos(os.path.join(pasta, "jogos.json"))
+        coleta.repositorio, historico.ARQUIVO_HISTORICO = repositorio, os.path.join(pasta, "historico.db")
+        try:
+            passos = [
+                ("primeira coleta", {}, 0, (200, True)),
+                ("dentro do frescor", {}, 60, (None, False)),
+                ("revalidação (304)", {}, 0, (304, False)),
+                ("página alterada", {"/v": (os.path.join(pasta, "vovoteca_alterada.html"), 0.05, 200)}, 0, (200, True)),
+                ("vovoteca com 503", {"/v": (None, 0.05, 503)}, 0, (503, True)),
+                ("vovoteca em backoff", {"/v": ("vovoteca.html", 0.05, 200)}, 0, (None, False)),
+            ]
+            for nome, mudancas, janela, (status_esperado, regrava) in passos:
+                rotas.update(mudancas)
+                frescor["valor"] = janela
+                coleta.FONTES = fontes()
+                antes_contagem, antes_versao = dict(servidor.contagem), repositorio.versao()
+                inicio = time.perf_counter()
+                coleta.executar_coleta()
+                decorrido = time.perf_counter() - inicio
+                novas = {st for (caminho, st), n in servidor.contagem.items() if caminho == "/v" and n != antes_contagem.get((caminho, st), 0)}
+                assert novas == ({status_esperado} if status_esperado else set()), (nome, novas)
+                assert (repositorio.versao() != antes_versao) == regrava, nome
+                print(f"cache_http: {nome:<22} vovoteca {str(status_esperado or '-'):>4} | jogos.json "
+                      f"{'regravado' if regrava else 'mantido':<9} | {decorrido * 1e3:6.1f} ms")
+        finally:
+            coleta.FONTES, coleta.repositorio, historico.ARQUIVO_HISTORICO = originais
+            servidor.shutdown()
+
+# --- 12. INSTRUMENTAÇÃO ---
+def bench_metricas():
+    import app as modulo_app
+    import metricas
+
+    jogos = _jogos_gabarito()
+    cliente = modulo_app.app.test_client()
+    formulario = _formulario(jogos, "Magnata")
+    cliente.get('/')
+
+    def sem_cache():
+        modulo_app.cache_resultados.limpar()
+        cliente.post('/', data=formulario)
+
+    casos = [
+        ("with etapa(...)", lambda: metricas.etapa('x').__enter__().__exit__(None, None, None), 100000),
+        ("GET / (cache de página)", lambda: cliente.get('/'), 500),
+        ("POST / (cache de resultado)", lambda: cliente.post('/', data=formulario), 500),
+        ("POST / (calculando)", sem_cache, 200),
+    ]
+    original = metricas.HABILITADO
+    try:
+        for nome, func, repeticoes in casos:
+            tempos = {}
+            for habilitado in (False, True):
+                metricas.HABILITADO = habilitado
+                tempos[habilitado] = min(_cronometrar(func, repeticoes) for _ in range(3))
+            print(f"metricas: {nome:<28} desligadas {tempos[False] * 1e6:8.1f} µs | ligadas {tempos[True] * 1e6:8.1f} µs "
+                  f"(+{(tempos[True] - tempos[False]) * 1e6:.1f} µs)")
+    finally:
+        metricas.HABILITADO = original
+    assert 'loteca_requisicao_segundos_count{rota="/",metodo="POST"}' in cliente.get('/metrics').get_data(as_text=True)
+
+# --- 13. EXPORTAÇÃO DAS APOSTAS ---
+def bench_exportacao():
+    import exportacao
+
+    jogos = [{"Jogo": i, "Mandante": f"CASA {i}", "Visitante": f"FORA {i}"} for i in range(1, 15)]
+    casos = [
+        ("Magnata (6 triplos)", [('1', 'X', '2')] * 6 + [('1',)] * 8),
+        ("Zorra (5 duplos, 3 triplos)", [('1', 'X')] * 5 + [('1', 'X', '2')] * 3 + [('1',)] * 6),
+        ("10 triplos", [('1', 'X', '2')] * 10 + [('1',)] * 4),
+        ("11 triplos", [('1', 'X', '2')] * 11 + [('1',)] * 3),
+    ]
+    for nome, opcoes in casos:
+        total = exportacao.total_apostas(opcoes)
+        for formato in ("csv", "xlsx"):
+            if total > exportacao.MAXIMO_APOSTAS[formato]:
+                continue
+            tamanho = [0]
+
+            def consumir():
+                tamanho[0] = sum(len(p) for p in exportacao.gerar_arquivo(
+                    formato, exportacao.expandir(opcoes), exportacao.cabecalho(jogos, 10), 10))
+            t, pico = _medir(consumir, 1)
+            print(f"exportacao: {nome:<28} {formato:<4} {total:>7,} apostas em {t * 1e3:8.1f} ms "
+                  f"({tamanho[0] / 2 ** 20:5.1f} MiB gerados, pico {pico / 1024:6.0f} KiB)")
+
+# --- 14. FECHAMENTOS ---
+def bench_fechamento():
+    import app as modulo_app
+    import fechamento
+
+    jogos = _jogos_gabarito()
+    casos = [(nome, modulo_app.aplicar_estrategia(jogos, nome)) for nome in ("Magnata", "Dono da Zorra Toda")]
+    for triplos in (8, 9, 10):
+        casos.append((f"{triplos} triplos", [dict(j, **{"Palpite IA": "TRIPLO (1 X 2)" if j['Jogo'] <= triplos else "COLUNA 1"}) for j in jogos]))
+
+    for nome, linhas in casos:
+        for garantia in (13, 12):
+            inicio = time.perf_counter()
+            sistema = fechamento.gerar_fechamento(linhas, garantia)
+            decorrido = time.perf_counter() - inicio
+            # Conferência: toda combinação coberta fica a no máximo 14 - garantia jogos de alguma aposta
+            codigos = fechamento.codificar(sistema['opcoes'])
+            maximo = max(fechamento.distancias(codigos[i:i + 4096], sistema['bilhetes']).min(axis=1).max()
+                         for i in range(0, len(codigos), 4096))
+            assert maximo <= 14 - garantia, (nome, garantia, maximo)
+            print(f"fechamento: {nome:<20} garantia {garantia}: {sistema['combinacoes']:>6} -> {sistema['apostas']:>5} apostas "
+                  f"(R$ {sistema['custo']:>9,.2f}, P14 {sistema['p14']:.4%}) em {decorrido:6.2f} s")
+
+BENCHMARKS = {
+    "motor": bench_motor,
+    "otimizador": bench_otimizador,
+    "lote": bench_lote,
+    "estrategia": bench_estrategia,
+    "importacao": bench_importacao,
+    "coleta": bench_coleta,
+    "pagina": bench_pagina,
+    "cache": bench_cache,
+    "historico": bench_historico,
+    "parser": bench_parser,
+    "cache_http": bench_cache_http,
+    "metricas": bench_metricas,
+    "exportacao": bench_exportacao,
+    "fechamento": bench_fechamento,
+}
+
+if __name__ == "__main__":
+    nomes = sys.argv[1:] or list(BENCHMARKS)
+    for nome in nomes:
+        BENCHMARKS[nome]()
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Cache de resultados do POST /: LRU com validade (TTL) em memória, opcionalmente
+# apoiado num backend compartilhado (Redis ou qualquer objeto com get/setex) para
+# que os workers do gunicorn aproveitem o trabalho uns dos outros.
+
+CAPACIDADE_PADRAO = 512
+VALIDADE_PADRAO = 600  # segundos
+PAUSA_BACKEND = 30  # segundos sem consultar o backend compartilhado depois de um erro
+
+def chave_resultado(jogos, modo, extras=None, versao=None):
+    # Hash canônico: probabilidades normalizadas e arredondadas, nomes, modo e versão dos dados
+    canonico = {
+        "jogos": [[j['Jogo'], j['Mandante'], j['Visitante'],
+                   round(j['Prob_Casa'], 6), round(j['Prob_Empate'], 6), round(j['Prob_Fora'], 6)] for j in jogos],
+        "modo": modo,
+        "extras": extras or {},
+        "versao": versao,
+    }
+    texto = json.dumps(canonico, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+class BackendRedis:
+    # Adaptador para um cliente no estilo redis-py (get/setex). Qualquer substituto
+    # local com a mesma interface serve (ex.: fakeredis nos testes).
+    def __init__(self, cliente, prefixo="loteca:resultado:"):
+        self.cliente = cliente
+        self.prefixo = prefixo
+
+    def get(self, chave):
+        valor = self.cliente.get(self.prefixo + chave)
+        return None if valor is None else json.loads(valor)
+
+    def set(self, chave, valor, validade):
+        self.cliente.setex(self.prefixo + chave, int(validade), json.dumps(valor, ensure_ascii=False))
+
+class CacheResultados:
+    def __init__(self, capacidade=CAPACIDADE_PADRAO, validade=VALIDADE_PADRAO, backend=None, pausa_backend=PAUSA_BACKEND):
+        self.capacidade = capacidade
+        self.validade = validade
+        self.backend = backend
+        self.pausa_backend = pausa_backend
+        self._backend_pausado_ate = 0.0
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+        self.acertos = self.falhas = self.remocoes = self.acertos_compartilhados = self.erros_backend = 0
+
+    def obter(self, chave):
+        agora = time.monotonic()
+        with self._trava:
+            item = self._itens.get(chave)
+            if item is not None:
+                expira, valor = item
+                if expira > agora:
+                    self._itens.move_to_end(chave)
+                    self.acertos += 1
+                    return valor
+                del self._itens[chave]
+                self.remocoes += 1
+        if self._backend_disponivel():
+            try:
+                valor = self.backend.get(chave)
+            except Exception as e:
+                valor = None
+                self._falha_backend(e)
+            if valor is not None:
+                self._guardar_local(chave, valor)
+                with self._trava:
+                    self.acertos_compartilhados += 1
+                return valor
+        with self._trava:
+            self.falhas += 1
+        return None
+
+    def guardar(self, chave, valor):
+        self._guardar_local(chave, valor)
+        if self._backend_disponivel():
+            try:
+                self.backend.set(chave, valor, self.validade)
+            except Exception as e:
+                self._falha_backend(e)
+
+    def _backend_disponivel(self):
+        return self.backend is not None and time.monotonic() >= self._backend_pausado_ate
+
+    def _falha_backend(self, erro):
+        # Circuito aberto: com o Redis fora do ar, cada requisição esperaria o timeout do
+        # socket no get e no setex; durante a pausa fica só o cache local
+        with self._trava:
+            self.erros_backend += 1
+            self._backend_pausado_ate = time.monotonic() + self.pausa_backend
+        print(f"Erro no cache compartilhado (ignorado por {self.pausa_backend} s): {erro}")
+
+    def _guardar_local(self, chave, valor):
+        with self._trava:
+            self._itens[chave] = (time.monotonic() + self.validade, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.capacidade:
+                self._itens.popitem(last=False)
+                self.remocoes += 1
+
+    def limpar(self):
+        with self._trava:
+            self._itens.clear()
+
+    def estatisticas(self):
+        with self._trava:
+            consultas = self.acertos + self.acertos_compartilhados + self.falhas
+            return {
+                "acertos": self.acertos,
+                "acertos_compartilhados": self.acertos_compartilhados,
+                "falhas": self.falhas,
+                "remocoes": self.remocoes,
+                "erros_backend": self.erros_backend,
+                "tamanho": len(self._itens),
+                "capacidade": self.capacidade,
+                "taxa_acerto": (self.acertos + self.acertos_compartilhados) / consultas if consultas else 0.0,
+                "compartilhado": self.backend is not None,
+                "backend_pausado": self.backend is not None and time.monotonic() < self._backend_pausado_ate,
+            }
+
+def backend_do_ambiente():
+    # LOTECA_REDIS_URL liga o cache compartilhado (requer o pacote redis, opcional)
+    url = os.environ.get('LOTECA_REDIS_URL')
+    if not url:
+        return None
+    try:
+        import redis
+    except ImportError:
+        print("LOTECA_REDIS_URL definido mas o pacote redis não está instalado; usando só cache local.")
+        return None
+    return BackendRedis(redis.Redis.from_url(url, socket_timeout=0.2))
+
+resultados = CacheResultados(
+    capacidade=int(os.environ.get('LOTECA_CACHE_CAPACIDADE', CAPACIDADE_PADRAO)),
+    validade=int(os.environ.get('LOTECA_CACHE_VALIDADE', VALIDADE_PADRAO)),
+    backend=backend_do_ambiente(),
+)
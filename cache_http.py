@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+# Cache HTTP em disco para o coletor: guarda corpo + metadados por URL e revalida
+# com ETag/If-Modified-Since. Dentro da janela de frescor nem vai à rede; se o
+# corpo não mudou (304 ou mesmo hash), devolve os dados já lidos da última vez.
+# Falhas (429/5xx/erro de rede) abrem um backoff exponencial por fonte.
+
+PASTA_CACHE_HTTP = os.environ.get('LOTECA_CACHE_HTTP', '.cache_http')
+BACKOFF_INICIAL = 60
+BACKOFF_MAXIMO = 3600
+STATUS_COM_BACKOFF = (429, 500, 502, 503, 504)
+
+class FonteEmBackoff(Exception):
+    pass
+
+class RespostaCache:
+    def __init__(self, corpo, codificacao, alterado, origem, dados=None):
+        self.corpo = corpo
+        self.codificacao = codificacao
+        self.alterado = alterado  # False: mesmo conteúdo da última leitura bem-sucedida
+        self.origem = origem      # 'rede', '304' ou 'fresco'
+        self.dados = dados        # dados lidos da última vez (quando inalterado)
+
+class CacheHTTP:
+    def __init__(self, pasta=PASTA_CACHE_HTTP):
+        self.pasta = pasta
+
+    def _caminho(self, url, extensao):
+        return os.path.join(self.pasta, hashlib.sha1(url.encode('utf-8')).hexdigest() + extensao)
+
+    def _gravar(self, caminho, conteudo):
+        os.makedirs(self.pasta, exist_ok=True)
+        descritor, temporario = tempfile.mkstemp(dir=self.pasta, suffix='.tmp')
+        with os.fdopen(descritor, 'wb') as f:
+            f.write(conteudo)
+        os.replace(temporario, caminho)
+
+    def ler_meta(self, url):
+        try:
+            with open(self._caminho(url, '.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _gravar_meta(self, url, meta):
+        self._gravar(self._caminho(url, '.json'), json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+
+    def _registrar_falha(self, url, meta, espera=None):
+        falhas = meta.get('falhas', 0) + 1
+        espera = espera if espera is not None else min(BACKOFF_MAXIMO, BACKOFF_INICIAL * 2 ** (falhas - 1))
+        meta.update(falhas=falhas, backoff_ate=time.time() + espera)
+        self._gravar_meta(url, meta)
+
+    def buscar(self, sessao, url, frescor=0, timeout=15):
+        # Devolve RespostaCache, ou None se a fonte respondeu com erro
+        meta = self.ler_meta(url)
+        agora = time.time()
+        if meta.get('backoff_ate', 0) > agora:
+            raise FonteEmBackoff(f"{url} em backoff por mais {meta['backoff_ate'] - agora:.0f} s")
+        if meta.get('dados') and agora - meta.get('buscado_em', 0) < frescor:
+            return RespostaCache(None, meta.get('codificacao'), False, 'fresco', meta['dados'])
+
+        cabecalhos = {}
+        if meta.get('dados'):  # só revalida se há uma leitura boa para reaproveitar
+            if meta.get('etag'): cabecalhos['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'): cabecalhos['If-Modified-Since'] = meta['last_modified']
+        try:
+            response = sessao.get(url, timeout=timeout, headers=cabecalhos)
+        except Exception:
+            self._registrar_falha(url, meta)
+            raise
+
+        if response.status_code == 304 and meta.get('dados'):
+            meta.update(buscado_em=agora, falhas=0, backoff_ate=0)
+            self._gravar_meta(url, meta)
+            return RespostaCache(None, meta.get('codificacao'), False, '304', meta['dados'])
+        if response.status_code in STATUS_COM_BACKOFF:
+            espera = response.headers.get('Retry-After')
+            self._registrar_falha(url, meta, float(espera) if espera and espera.isdigit() else None)
+            return None
+        if response.status_code != 200:
+            return None
+
+        corpo = response.content
+        resumo = hashlib.sha256(corpo).hexdigest()
+        codificacao = response.encoding if 'charset' in response.headers.get('Content-Type', '').lower() else 'utf-8'
+        alterado = resumo != meta.get('sha256') or not meta.get('dados')
+        if alterado:  # última versão do corpo fica em disco para inspeção
+            self._gravar(self._caminho(url, '.html'), corpo)
+        meta.update(etag=response.headers.get('ETag'), last_modified=response.headers.get('Last-Modified'),
+                    sha256=resumo, codificacao=codificacao, buscado_em=agora, falhas=0, backoff_ate=0)
+        if alterado:
+            meta.pop('dados', None)
+        self._gravar_meta(url, meta)
+        return RespostaCache(corpo, codificacao, alterado, 'rede', None if alterado else meta['dados'])
+
+    def guardar_dados(self, url, dados):
+        # Chamado depois de uma leitura completa: habilita revalidação e o atalho do "não mudou"
+        meta = self.ler_meta(url)
+        meta['dados'] = dados
+        self._gravar_meta(url, meta)
@@ -0,0 +1,179 @@
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import requests
+
+from benchmark import servidor_local, _formulario, _jogos_gabarito
+
+# Teste de carga local: sobe o app no gunicorn com cada configuração de worker,
+# com as fontes substituídas por um servidor local (fixtures/), e dispara uma
+# mistura de GET /, POST / e /atualizar_agora com N clientes simultâneos.
+# Uso: python carga.py [--duracao 10] [--clientes 8] [--config gthread:2x4 ...] [--mistura get=60,post=40 ...]
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+CONFIGURACOES_PADRAO = ["sync:2", "gthread:2x4", "gevent:2"]
+MISTURAS_PADRAO = ["get=60,post=40", "get=60,post=35,atualizar=5"]
+ATRASO_FONTES = 0.3  # segundos que o servidor local leva para responder cada fonte
+
+def _porta_livre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _ler_configuracao(texto):
+    # "gthread:2x4" -> ("gthread", 2 workers, 4 threads); "sync:2" -> ("sync", 2, 1)
+    classe, _, tamanho = texto.partition(":")
+    workers, _, threads = (tamanho or "2").partition("x")
+    return classe, int(workers), int(threads or 1)
+
+def _ler_mistura(texto):
+    pesos = {tipo: float(peso) for tipo, peso in (parte.split("=") for parte in texto.split(","))}
+    invalidos = set(pesos) - {"get", "post", "atualizar"}
+    if invalidos: raise ValueError(f"Tipos desconhecidos na mistura: {', '.join(invalidos)}")
+    return pesos
+
+# --- 1. SERVIDOR ---
+def iniciar_app(configuracao, pasta, base_fontes):
+    classe, workers, threads = _ler_configuracao(configuracao)
+    porta = _porta_livre()
+    ambiente = dict(os.environ, PORT=str(porta), LOTECA_WORKER_CLASS=classe, WEB_CONCURRENCY=str(workers),
+                    LOTECA_THREADS=str(threads), PYTHONPATH=PASTA, LOTECA_INTERVALO_ATUALIZACAO="0",
+                    LOTECA_URL_VOVOTECA=base_fontes + "/v", LOTECA_URL_CAIXA=base_fontes + "/c",
+                    LOTECA_FRESCOR_VOVOTECA="0", LOTECA_FRESCOR_CAIXA="0")
+    # Roda dentro da pasta temporária: jogos.json, histórico e cache HTTP ficam isolados
+    processo = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", os.path.join(PASTA, "gunicorn.conf.py"), "app:app"],
+                                cwd=pasta, env=ambiente, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    base = f"http://127.0.0.1:{porta}"
+    limite = time.monotonic() + 30
+    while time.monotonic() < limite:
+        if processo.poll() is not None:
+            raise RuntimeError(f"gunicorn ({configuracao}) encerrou: {processo.stderr.read()[-2000:]}")
+        try:
+            if requests.get(base + "/status_atualizacao", timeout=1).ok:
+                return processo, base
+        except requests.RequestException:
+            time.sleep(0.2)
+    processo.terminate()
+    raise RuntimeError(f"gunicorn ({configuracao}) não respondeu em 30 s")
+
+def _preparar_dados(base):
+    # Primeira coleta (nas fontes locais) para a página inicial ter o jogos.json de verdade
+    requests.get(base + "/atualizar_agora", allow_redirects=False, timeout=5)
+    limite = time.monotonic() + 20
+    while time.monotonic() < limite and requests.get(base + "/status_atualizacao", timeout=5).json().get("estado") == "em_andamento":
+        time.sleep(0.2)
+
+# --- 2. CLIENTES ---
+def _formularios_repetidos():
+    from app import CONFIG_APOSTAS
+    return [_formulario(_jogos_gabarito(), modo) for modo in CONFIG_APOSTAS]
+
+def _formulario_novo(rng, modos):
+    # Probabilidades inéditas: obriga o servidor a calcular (falha no cache de resultados)
+    probs = rng.dirichlet([2, 1.5, 1.5], size=14) * 100
+    jogos = [{"Jogo": i + 1, "Mandante": f"CASA {i + 1}", "Visitante": f"FORA {i + 1}",
+              "Prob_Casa": round(p[0], 3), "Prob_Empate": round(p[1], 3), "Prob_Fora": round(p[2], 3)} for i, p in enumerate(probs)]
+    return _formulario(jogos, modos[rng.integers(len(modos))])
+
+def executar_carga(base, duracao, clientes, mistura, repetidos=0.5, semente=0):
+    # Clientes em laço fechado (sem pausa entre requisições); devolve {tipo: [(latência, ok), ...]}
+    tipos = list(mistura)
+    pesos = np.array([mistura[t] for t in tipos], dtype=float)
+    pesos /= pesos.sum()
+    formularios = _formularios_repetidos()
+    modos = [f['modo_selecionado'] for f in formularios]
+    medidas = {t: [] for t in tipos}
+    trava = threading.Lock()
+    fim = time.monotonic() + duracao
+
+    def cliente(n):
+        rng = np.random.default_rng(semente + n)
+        sessao = requests.Session()
+        locais = {t: [] for t in tipos}
+        while time.monotonic() < fim:
+            tipo = tipos[rng.choice(len(tipos), p=pesos)]
+            inicio = time.perf_counter()
+            try:
+                if tipo == "get":
+                    ok = sessao.get(base + "/", timeout=30).status_code == 200
+                elif tipo == "post":
+                    form = formularios[rng.integers(len(formularios))] if rng.random() < repetidos else _formulario_novo(rng, modos)
+                    ok = sessao.post(base + "/", data=form, timeout=30).status_code == 200
+                else:
+                    ok = sessao.get(base + "/atualizar_agora", allow_redirects=False, timeout=30).status_code == 302
+            except requests.RequestException:
+                ok = False
+            locais[tipo].append((time.perf_counter() - inicio, ok))
+        with trava:
+            for t in tipos:
+                medidas[t].extend(locais[t])
+
+    threads = [threading.Thread(target=cliente, args=(n,)) for n in range(clientes)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    return medidas
+
+def resumir(medidas, duracao):
+    linhas = []
+    todas = [m for lista in medidas.values() for m in lista]
+    for tipo, lista in list(medidas.items()) + [("total", todas)]:
+        if not lista: continue
+        latencias = np.array([l for l, _ in lista]) * 1e3
+        linhas.append({"tipo": tipo, "requisicoes": len(lista), "por_segundo": len(lista) / duracao,
+                       "p50": float(np.percentile(latencias, 50)), "p99": float(np.percentile(latencias, 99)),
+                       "maximo": float(latencias.max()), "erros": sum(1 for _, ok in lista if not ok)})
+    return linhas
+
+def imprimir_resumo(linhas, titulo):
+    print(f"\n=== {titulo} ===")
+    print(f"{'Tipo':<10} {'Reqs':>7} {'Req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'Máx ms':>8} {'Erros':>6}")
+    for r in linhas:
+        print(f"{r['tipo']:<10} {r['requisicoes']:>7} {r['por_segundo']:>8.1f} {r['p50']:>8.1f} {r['p99']:>8.1f} {r['maximo']:>8.1f} {r['erros']:>6}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste de carga local da Loteca Pro IA (gunicorn + fontes simuladas)")
+    parser.add_argument("--config", action="append", help="classe:workers[xthreads], ex.: gthread:2x4 (repetível)")
+    parser.add_argument("--mistura", action="append", help="pesos por tipo, ex.: get=60,post=35,atualizar=5 (repetível)")
+    parser.add_argument("--duracao", type=float, default=10, help="segundos de carga por rodada")
+    parser.add_argument("--clientes", type=int, default=8, help="clientes simultâneos")
+    parser.add_argument("--repetidos", type=float, default=0.5, help="fração dos POST com formulários repetidos (acertam o cache)")
+    args = parser.parse_args()
+    misturas = {m: _ler_mistura(m) for m in (args.mistura or MISTURAS_PADRAO)}
+
+    fontes, base_fontes = servidor_local({"/v": ("vovoteca.html", ATRASO_FONTES, 200), "/c": ("caixa.html", ATRASO_FONTES, 200)})
+    placar, falhou = [], False
+    for configuracao in args.config or CONFIGURACOES_PADRAO:
+        if _ler_configuracao(configuracao)[0] == "gevent":
+            try:
+                import gevent  # noqa: F401
+            except ImportError:
+                print(f"\n=== {configuracao}: pulado (gevent não instalado) ===")
+                continue
+        with tempfile.TemporaryDirectory() as pasta:
+            processo, base = iniciar_app(configuracao, pasta, base_fontes)
+            try:
+                _preparar_dados(base)
+                for texto, mistura in misturas.items():
+                    executar_carga(base, min(2, args.duracao), args.clientes, mistura, args.repetidos)  # aquecimento
+                    linhas = resumir(executar_carga(base, args.duracao, args.clientes, mistura, args.repetidos), args.duracao)
+                    imprimir_resumo(linhas, f"{configuracao} | {texto} | {args.clientes} clientes")
+                    total = linhas[-1]
+                    placar.append((configuracao, texto, total))
+                    falhou |= total["erros"] > 0
+            finally:
+                processo.terminate()
+                processo.wait(timeout=30)
+    fontes.shutdown()
+
+    print("\n=== Resumo (total por configuração) ===")
+    for configuracao, texto, total in sorted(placar, key=lambda p: (p[1], -p[2]["por_segundo"])):
+        situacao = "OK" if total["erros"] == 0 else f"{total['erros']} ERROS"
+        print(f"{configuracao:<14} {texto:<28} {total['por_segundo']:>8.1f} req/s  p50 {total['p50']:>7.1f} ms  p99 {total['p99']:>7.1f} ms  {situacao}")
+    sys.exit(1 if falhou else 0)
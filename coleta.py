@@ -1,13 +1,45 @@
 import cloudscraper
-from bs4 import BeautifulSoup
-import json
+import os
+import threading
+import time
 import requests
 import urllib3
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from dados import repositorio, NOME_ARQUIVO_DADOS
+from leitores import ler_vovoteca, ler_caixa
+from cache_http import CacheHTTP
+import metricas
+from metricas import etapa
+import historico
+import sqlite3
 
 # Desabilita avisos de segurança
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-NOME_ARQUIVO_DADOS = 'jogos.json'
+# Endereços das fontes (sobrescrevíveis por variável de ambiente para testes offline)
+URL_VOVOTECA = os.environ.get('LOTECA_URL_VOVOTECA', "https://vovoteca.com/loteca-enquetes-secos-duplos/")
+URL_CAIXA = os.environ.get('LOTECA_URL_CAIXA', "https://loterias.caixa.gov.br/Paginas/Programacao-Loteca.aspx")
+TIMEOUT_FONTE = 15
+
+# Cache HTTP das fontes: dentro da janela de frescor (s) a página nem é baixada;
+# fora dela, revalida com ETag/If-Modified-Since
+FRESCOR_VOVOTECA = int(os.environ.get('LOTECA_FRESCOR_VOVOTECA', 120))
+FRESCOR_CAIXA = int(os.environ.get('LOTECA_FRESCOR_CAIXA', 900))
+cache_fontes = CacheHTTP()
+
+# inalterado=True: mesma página da última leitura, dados vindos do cache
+ResultadoFonte = namedtuple('ResultadoFonte', 'dados fonte inalterado')
+
+# Sessões reaproveitadas entre coletas (pool de conexões + cookies do cloudflare)
+_sessoes = {}
+_trava_sessoes = threading.Lock()
+
+def obter_sessao(nome):
+    with _trava_sessoes:
+        if nome not in _sessoes:
+            _sessoes[nome] = cloudscraper.create_scraper()
+        return _sessoes[nome]
 
 # --- LISTA DE SEGURANÇA (CASO TUDO FALHE) ---
 JOGOS_BACKUP = [
@@ -27,78 +59,88 @@ JOGOS_BACKUP = [
     {"Jogo": 14, "Mandante": "MIRASSOL/SP", "Visitante": "SAO PAULO/SP"}
 ]
 
-def buscar_vovoteca():
+def _buscar(url, scraper, cache, frescor, ler, fonte, rotulo):
+    # Página igual à última (frescor, 304 ou mesmo hash): reaproveita os dados sem ler o HTML
+    with etapa(f'coleta_rede_{rotulo}'):
+        resposta = cache.buscar(scraper, url, frescor, TIMEOUT_FONTE)
+    if resposta is None:
+        metricas.CONSULTAS_FONTES.incrementar(rotulo, 'falha')
+        return None
+    metricas.CONSULTAS_FONTES.incrementar(rotulo, resposta.origem)
+    if not resposta.alterado:
+        print(f"♻️ {fonte}: página sem mudanças ({resposta.origem})")
+        return ResultadoFonte(resposta.dados, fonte, True)
+    with etapa(f'coleta_leitura_{rotulo}'):
+        dados = ler(resposta.corpo, resposta.codificacao)
+    if len(dados) < 14:
+        metricas.CONSULTAS_FONTES.incrementar(rotulo, 'incompleta')
+        return None
+    cache.guardar_dados(url, dados)
+    return ResultadoFonte(dados, fonte, False)
+
+def buscar_vovoteca(url=None, sessao=None, cache=None, frescor=None):
     print("⏳ Tentando Vovoteca...")
-    url = "https://vovoteca.com/loteca-enquetes-secos-duplos/"
-    scraper = cloudscraper.create_scraper()
     try:
-        response = scraper.get(url, timeout=15)
-        if response.status_code != 200: return None
-        soup = BeautifulSoup(response.content, 'html.parser')
-        dados = []
-        contagem = 0
-        for i in range(1, 15):
-            linha = soup.find('tr', id=f'tr-linha-{i}')
-            if not linha: continue
-            cols = linha.find_all('td')
-            if len(cols) < 6: continue
-            
-            mandante = cols[1].text.strip()
-            visitante = cols[5].text.strip()
-            idx = i - 1
-            try:
-                p1 = float(soup.find('td', id=f'resultado-{idx}-home').text.strip().replace('%','').replace(',','.'))
-                p2 = float(soup.find('td', id=f'resultado-{idx}-away').text.strip().replace('%','').replace(',','.'))
-                px = 100 - (p1 + p2)
-            except: p1, px, p2 = 33, 34, 33
-
-            dados.append({"Jogo": i, "Mandante": mandante, "Visitante": visitante, "Prob_Casa": p1, "Prob_Empate": px, "Prob_Fora": p2})
-            contagem += 1
-        
-        if contagem < 14: return None
-        return dados, "Vovoteca (Automático)"
+        return _buscar(url or URL_VOVOTECA, sessao or obter_sessao("vovoteca"), cache or cache_fontes,
+                       FRESCOR_VOVOTECA if frescor is None else frescor, ler_vovoteca, "Vovoteca (Automático)", "vovoteca")
     except Exception as e:
         print(f"Erro Vovoteca: {e}")
+        metricas.CONSULTAS_FONTES.incrementar("vovoteca", "falha")
         return None
 
-def buscar_caixa():
+def buscar_caixa(url=None, sessao=None, cache=None, frescor=None):
     print("⏳ Tentando Caixa...")
-    url = "https://loterias.caixa.gov.br/Paginas/Programacao-Loteca.aspx"
-    scraper = cloudscraper.create_scraper()
     try:
-        response = scraper.get(url, timeout=15)
-        if response.status_code != 200: return None
-        soup = BeautifulSoup(response.content, 'html.parser')
-        dados = []
-        tabela = soup.find('table', class_='loteca')
-        if not tabela: return None
-        
-        for linha in tabela.find_all('tr'):
-            cols = linha.find_all('td')
-            if len(cols) >= 5:
-                try:
-                    jogo_num = cols[0].text.strip()
-                    if not jogo_num.isdigit(): continue
-                    mandante = cols[2].text.strip()
-                    visitante = cols[4].text.strip()
-                    if mandante and visitante:
-                        dados.append({"Jogo": int(jogo_num), "Mandante": mandante, "Visitante": visitante, "Prob_Casa": 33, "Prob_Empate": 34, "Prob_Fora": 33})
-                except: continue
-        if len(dados) < 14: return None
-        return dados, "Caixa (Nomes Oficiais)"
+        return _buscar(url or URL_CAIXA, sessao or obter_sessao("caixa"), cache or cache_fontes,
+                       FRESCOR_CAIXA if frescor is None else frescor, ler_caixa, "Caixa (Nomes Oficiais)", "caixa")
     except Exception as e:
         print(f"Erro Caixa: {e}")
+        metricas.CONSULTAS_FONTES.incrementar("caixa", "falha")
         return None
 
-def executar_coleta():
-    # 1. Tenta Vovoteca
-    resultado = buscar_vovoteca()
-    
-    # 2. Se falhar, tenta Caixa
-    if not resultado:
-        resultado = buscar_caixa()
+# Ordem de prioridade: a primeira fonte completa vence
+FONTES = [buscar_vovoteca, buscar_caixa]
+
+def coletar_fontes(fontes=None, timeout=TIMEOUT_FONTE + 5):
+    # Consulta todas as fontes em paralelo. Assim que a fonte de maior prioridade
+    # ainda possível responde com dados completos, as demais são abandonadas.
+    fontes = list(fontes or FONTES)
+    executor = ThreadPoolExecutor(max_workers=len(fontes), thread_name_prefix="coleta")
+    futuros = {executor.submit(fonte): prioridade for prioridade, fonte in enumerate(fontes)}
+    resultados = [None] * len(fontes)
+    resolvidas = [False] * len(fontes)
+    escolhido = None
+    try:
+        for futuro in as_completed(futuros, timeout=timeout):
+            prioridade = futuros[futuro]
+            try:
+                resultados[prioridade] = futuro.result()
+            except Exception as e:
+                print(f"Erro na fonte {getattr(fontes[prioridade], '__name__', prioridade)}: {e}")
+            resolvidas[prioridade] = True
+            for i in range(len(fontes)):
+                if resultados[i]:
+                    escolhido = resultados[i]
+                    break
+                if not resolvidas[i]:
+                    break
+            if escolhido or all(resolvidas):
+                break
+    except FuturesTimeout:
+        print("⚠️ Tempo esgotado esperando as fontes.")
+        escolhido = next((r for r in resultados if r), None)
+    finally:
+        # Retardatárias: canceladas se não começaram; as em andamento terminam sozinhas pelo timeout
+        executor.shutdown(wait=False, cancel_futures=True)
+    return escolhido
+
+def executar_coleta(concurso=None):
+    inicio = time.perf_counter()
+    # 1. Consulta Vovoteca e Caixa ao mesmo tempo (Vovoteca tem prioridade)
+    with etapa('coleta_fontes'):
+        resultado = coletar_fontes()
     
-    # 3. Se falhar tudo, usa Backup
+    # 2. Se falhar tudo, usa Backup
     if not resultado:
         print("⚠️ Falha total na internet. Usando Backup Local.")
         dados_finais = []
@@ -108,18 +150,29 @@ def executar_coleta():
             dados_finais.append(d)
         fonte = "Backup Offline"
     else:
-        dados_finais, fonte = resultado
+        dados_finais, fonte, inalterado = resultado
+        # Mesma página que gerou o jogos.json atual: nada a regravar nem a registrar
+        if inalterado and repositorio.carregar()[:2] == (dados_finais, fonte):
+            metricas.COLETAS.observar(time.perf_counter() - inicio, fonte)
+            print(f"✅ Sem mudanças em {fonte}; '{NOME_ARQUIVO_DADOS}' mantido.")
+            return
 
-    # SALVA NO ARQUIVO JSON
-    pacote = {
-        "fonte": fonte,
-        "jogos": dados_finais
-    }
-    
-    with open(NOME_ARQUIVO_DADOS, 'w', encoding='utf-8') as f:
-        json.dump(pacote, f, indent=4, ensure_ascii=False)
+    # SALVA NO ARQUIVO JSON (gravação atômica)
+    with etapa('coleta_gravacao'):
+        repositorio.salvar(dados_finais, fonte)
+
+    # GUARDA NO HISTÓRICO (o backup offline não é dado real, fica de fora)
+    if resultado:
+        try:
+            with etapa('coleta_historico'):
+                historico.registrar_coleta(dados_finais, fonte, concurso)
+        except sqlite3.Error as e:
+            print(f"Erro gravando histórico: {e}")
     
+    metricas.COLETAS.observar(time.perf_counter() - inicio, fonte)
     print(f"✅ SUCESSO! Dados salvos em '{NOME_ARQUIVO_DADOS}' usando fonte: {fonte}")
 
 if __name__ == "__main__":
-    executar_coleta()
\ No newline at end of file
+    import sys
+    # Opcional: número do concurso, para o histórico
+    executar_coleta(int(sys.argv[1]) if len(sys.argv) > 1 else None)
\ No newline at end of file
@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+
+# Camada de dados do jogos.json: o conteúdo fica em memória e só é relido quando
+# o arquivo muda (mtime/tamanho/inode). A gravação é atômica (temporário + rename),
+# então leitores nunca veem um arquivo pela metade.
+
+NOME_ARQUIVO_DADOS = 'jogos.json'
+
+class RepositorioJogos:
+    def __init__(self, caminho=NOME_ARQUIVO_DADOS):
+        self.caminho = caminho
+        self._trava = threading.Lock()
+        self._assinatura = None
+        self._pacote = None
+
+    def _assinatura_atual(self):
+        try:
+            st = os.stat(self.caminho)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    @staticmethod
+    def _versao(assinatura):
+        return None if assinatura is None else f"{assinatura[0]:x}-{assinatura[1]:x}-{assinatura[2]:x}"
+
+    def carregar(self):
+        # Devolve (jogos, fonte, versao); versao é None quando não há dados válidos
+        assinatura = self._assinatura_atual()
+        if assinatura is None:
+            return [], "Sem dados. Clique em Atualizar!", None
+        with self._trava:
+            if assinatura != self._assinatura:
+                try:
+                    with open(self.caminho, 'r', encoding='utf-8') as f:
+                        pacote = json.load(f)
+                    self._pacote = (pacote['jogos'], pacote['fonte'])
+                except (OSError, ValueError, KeyError, TypeError) as e:
+                    print(f"Erro lendo '{self.caminho}': {e}")
+                    self._pacote = None
+                self._assinatura = assinatura
+            if self._pacote is None:
+                return [], "Erro no arquivo.", None
+            jogos, fonte = self._pacote
+            return jogos, fonte, self._versao(assinatura)
+
+    def versao(self):
+        return self._versao(self._assinatura_atual())
+
+    def modificado_em(self):
+        assinatura = self._assinatura_atual()
+        if assinatura is None:
+            return None
+        return datetime.fromtimestamp(assinatura[0] // 1_000_000_000, tz=timezone.utc)
+
+    def salvar(self, jogos, fonte):
+        pacote = {"fonte": fonte, "jogos": jogos}
+        pasta = os.path.dirname(os.path.abspath(self.caminho))
+        descritor, temporario = tempfile.mkstemp(prefix='.jogos-', suffix='.tmp', dir=pasta)
+        try:
+            with os.fdopen(descritor, 'w', encoding='utf-8') as f:
+                json.dump(pacote, f, ensure_ascii=False, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporario, self.caminho)
+        except BaseException:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+        with self._trava:
+            self._assinatura = self._assinatura_atual()
+            self._pacote = (jogos, fonte)
+            return self._versao(self._assinatura)
+
+repositorio = RepositorioJogos()
@@ -0,0 +1,91 @@
+import csv
+import io
+import itertools
+import os
+import tempfile
+
+from motor import RESULTADOS, NUM_JOGOS
+
+# Exportação das apostas simples em streaming: as combinações saem de um gerador
+# (itertools.product) direto para o CSV/XLSX, sem montar a lista inteira. Qualquer
+# iterável de bilhetes (tuplas de 14 resultados '1'/'X'/'2') serve, inclusive os
+# conjuntos reduzidos do fechamento.
+
+# Limite de apostas por arquivo (o openpyxl escreve ~10 mil linhas/s, o csv ~1 milhão)
+MAXIMO_APOSTAS = {"csv": 200000, "xlsx": 60000}
+LINHAS_POR_BLOCO = 1000          # CSV: linhas por pedaço enviado
+TAMANHO_PEDACO_ARQUIVO = 64 * 1024  # XLSX: bytes por pedaço lido do arquivo temporário
+
+FORMATOS = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# --- 1. EXPANSÃO ---
+def opcoes_do_palpite(texto):
+    # "COLUNA 1" -> ('1',), "DUPLO 1X" -> ('1', 'X'), "DUPLO 1 2" -> ('1', '2'), "TRIPLO (1 X 2)" -> ('1', 'X', '2')
+    partes = (texto or '').upper().split(maxsplit=1)
+    opcoes = tuple(r for r in RESULTADOS if len(partes) == 2 and r in partes[1])
+    if not opcoes:
+        raise ValueError(f"Palpite inválido: {texto!r}")
+    return opcoes
+
+def total_apostas(opcoes_por_jogo):
+    total = 1
+    for opcoes in opcoes_por_jogo:
+        total *= len(opcoes)
+    return total
+
+def expandir(opcoes_por_jogo):
+    # Gera cada aposta simples sob demanda: memória constante, qualquer que seja o total
+    return itertools.product(*opcoes_por_jogo)
+
+def _linhas(bilhetes, por_volante):
+    for n, bilhete in enumerate(bilhetes):
+        if len(bilhete) != NUM_JOGOS:
+            raise ValueError(f"Aposta {n + 1} tem {len(bilhete)} jogos (esperado {NUM_JOGOS}).")
+        yield (n // por_volante + 1, n % por_volante + 1, *bilhete) if por_volante else (n + 1, *bilhete)
+
+def cabecalho(jogos, por_volante=None):
+    colunas = [f"{j['Jogo']} {j['Mandante']} x {j['Visitante']}" for j in jogos]
+    return (["Volante", "Aposta"] if por_volante else ["Aposta"]) + colunas
+
+# --- 2. ESCRITA EM STREAMING ---
+def gerar_csv(bilhetes, titulos, por_volante=None):
+    # Pedaços de texto prontos para uma resposta em streaming (BOM para o Excel reconhecer o UTF-8)
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer, delimiter=';', lineterminator='\r\n')
+    buffer.write('\ufeff')
+    escritor.writerow(titulos)
+    for n, linha in enumerate(_linhas(bilhetes, por_volante), 1):
+        escritor.writerow(linha)
+        if n % LINHAS_POR_BLOCO == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def gerar_xlsx(bilhetes, titulos, por_volante=None):
+    # O openpyxl em modo write-only grava as linhas em disco conforme chegam; o .xlsx
+    # final (um zip) vai para um arquivo temporário, enviado em pedaços e apagado no fim
+    from openpyxl import Workbook
+
+    descritor, caminho = tempfile.mkstemp(suffix='.xlsx')
+    os.close(descritor)
+    try:
+        livro = Workbook(write_only=True)
+        planilha = livro.create_sheet("Apostas")
+        planilha.append(titulos)
+        for linha in _linhas(bilhetes, por_volante):
+            planilha.append(linha)
+        livro.save(caminho)
+        with open(caminho, 'rb') as f:
+            while pedaco := f.read(TAMANHO_PEDACO_ARQUIVO):
+                yield pedaco
+    finally:
+        os.remove(caminho)
+
+def gerar_arquivo(formato, bilhetes, titulos, por_volante=None):
+    if formato == "xlsx":
+        return gerar_xlsx(bilhetes, titulos, por_volante)
+    return gerar_csv(bilhetes, titulos, por_volante)
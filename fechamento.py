@@ -0,0 +1,185 @@
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from motor import NUM_JOGOS, RESULTADOS, VALOR_APOSTA_SIMPLES, matriz_probabilidades
+from exportacao import opcoes_do_palpite
+
+# Fechamentos (sistemas reduzidos): em vez de todas as combinações do bilhete,
+# um subconjunto que garante pelo menos G acertos em algum volante sempre que o
+# resultado cair dentro das coberturas (duplos/triplos). É um problema de cobertura:
+# cada aposta "cobre" as combinações a até 14 - G jogos de distância dela.
+#
+# Cada aposta vira um bitset de 42 bits (3 bits one-hot por jogo) num uint64; a
+# distância entre duas apostas é popcount(a ^ b) / 2. A busca é gulosa: escolhe a
+# aposta que cobre mais combinações ainda descobertas e desconta, só das vizinhas
+# das recém-cobertas, as contagens das demais candidatas.
+
+MAXIMO_COMBINACOES = 60000
+# No /exportar a busca roda dentro da requisição, em uma thread só: ~0,6 s de CPU com 3^9 combinações
+MAXIMO_COMBINACOES_WEB = 20000
+ELEMENTOS_POR_BLOCO = 1 << 21  # pedaço da matriz de distâncias calculado por vez (~16 MiB em uint64)
+GARANTIAS_RELATORIO = (14, 13, 12, 11)
+
+if hasattr(np, 'bitwise_count'):  # numpy >= 2.0
+    _contar_bits = np.bitwise_count
+else:
+    _BITS_POR_BYTE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def _contar_bits(x):
+        x = np.ascontiguousarray(x, dtype=np.uint64)
+        return _BITS_POR_BYTE[x.view(np.uint8)].reshape(x.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+# Posição do bit ligado (1, 2 ou 4) -> índice em RESULTADOS
+_INDICE_DO_BIT = np.array([-1, 0, 1, -1, 2, -1, -1, -1])
+
+# --- 1. CODIFICAÇÃO ---
+def codificar(opcoes_por_jogo):
+    # Mesma ordem do itertools.product: a última coluna varia mais rápido
+    codigos = np.zeros(1, dtype=np.uint64)
+    for jogo, opcoes in enumerate(opcoes_por_jogo):
+        bits = np.array([1 << (3 * jogo + RESULTADOS.index(r)) for r in opcoes], dtype=np.uint64)
+        codigos = (codigos[:, None] | bits[None, :]).ravel()
+    return codigos
+
+def _indices(codigos):
+    # (N, 14) com o índice do resultado de cada jogo
+    deslocamentos = (3 * np.arange(NUM_JOGOS)).astype(np.uint64)
+    return _INDICE_DO_BIT[((codigos[:, None] >> deslocamentos) & np.uint64(7)).astype(np.intp)]
+
+def decodificar(codigos):
+    for linha in _indices(np.asarray(codigos, dtype=np.uint64)).tolist():
+        yield tuple(RESULTADOS[i] for i in linha)
+
+def distancias(a, b):
+    # Número de jogos em que cada par de apostas difere: (len(a), len(b))
+    return _contar_bits(a[:, None] ^ b[None, :]) >> 1
+
+# --- 2. BUSCA GULOSA ---
+def _somar_bolas(centros, codigos, raio, executor):
+    # Para cada aposta de `codigos`, quantos `centros` estão a até `raio` jogos dela
+    linhas = max(1, ELEMENTOS_POR_BLOCO // len(codigos))
+    blocos = [centros[i:i + linhas] for i in range(0, len(centros), linhas)]
+    contar = lambda bloco: (distancias(bloco, codigos) <= raio).sum(axis=0)
+    parciais = executor.map(contar, blocos) if executor is not None and len(blocos) > 1 else map(contar, blocos)
+    return sum(parciais, np.zeros(len(codigos), dtype=np.int64))
+
+def cobrir(codigos, raio, trabalhadores=None, pesos=None):
+    # Índices (em `codigos`) de um conjunto de apostas que deixa toda combinação a até `raio` jogos de alguma.
+    # pesos (opcional, em [0, 1)): desempate entre candidatas que cobrem o mesmo número de combinações
+    if raio <= 0:
+        return np.arange(len(codigos))
+    trabalhadores = trabalhadores or os.cpu_count() or 1
+    executor = ThreadPoolExecutor(max_workers=trabalhadores) if trabalhadores > 1 else None  # numpy solta o GIL
+    try:
+        contagens = _somar_bolas(codigos, codigos, raio, executor)  # simétrico: tamanho da bola de cada candidata
+        coberto = np.zeros(len(codigos), dtype=bool)
+        escolhidos = []
+        desempate = np.zeros(len(codigos)) if pesos is None else np.asarray(pesos, dtype=float)
+        while not coberto.all():
+            j = int(np.argmax(contagens + desempate))
+            escolhidos.append(j)
+            novos = np.flatnonzero(~coberto & (distancias(codigos[j:j + 1], codigos)[0] <= raio))
+            coberto[novos] = True
+            contagens -= _somar_bolas(codigos[novos], codigos, raio, executor)
+        # Poda: de trás para frente, descarta apostas cujas combinações todas já têm outra cobertura
+        multiplicidade = _somar_bolas(codigos[escolhidos], codigos, raio, executor)
+        mantidos = []
+        for j in reversed(escolhidos):
+            bola = distancias(codigos[j:j + 1], codigos)[0] <= raio
+            if multiplicidade[bola].min() >= 2:
+                multiplicidade[bola] -= 1
+            else:
+                mantidos.append(j)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return np.array(sorted(mantidos))
+
+# --- 3. FECHAMENTO E RELATÓRIO ---
+def _probabilidades(codigos, probs):
+    return np.prod(probs[np.arange(NUM_JOGOS), _indices(codigos)], axis=1)
+
+def _chances(bilhetes, probs):
+    # P(14): soma das probabilidades das apostas (são combinações distintas).
+    # P(13+): soma sobre todas as combinações a até 1 jogo de alguma aposta, inclusive fora das coberturas.
+    vizinhos = [bilhetes]
+    for jogo in range(NUM_JOGOS):
+        sem_jogo = bilhetes & ~np.uint64(7 << (3 * jogo))
+        vizinhos += [sem_jogo | np.uint64(1 << (3 * jogo + r)) for r in range(3)]
+    return float(_probabilidades(bilhetes, probs).sum()), float(_probabilidades(np.unique(np.concatenate(vizinhos)), probs).sum())
+
+def _opcoes_e_probs(linhas):
+    linhas = sorted(linhas, key=lambda j: int(j['Jogo']))
+    if len(linhas) != NUM_JOGOS:
+        raise ValueError(f"O bilhete tem {len(linhas)} jogos (esperado {NUM_JOGOS}).")
+    opcoes = [opcoes_do_palpite(j['Palpite IA']) for j in linhas]
+    probs = matriz_probabilidades(np.array([[j.get('Prob_Casa', 1), j.get('Prob_Empate', 1), j.get('Prob_Fora', 1)] for j in linhas], dtype=float))
+    return opcoes, probs
+
+def gerar_fechamento(linhas, garantia=13, trabalhadores=None, limite=MAXIMO_COMBINACOES):
+    # linhas: saída de aplicar_estrategia/aplicar_otimizacao (usa 'Palpite IA' e as probabilidades)
+    if not 0 < garantia <= NUM_JOGOS:
+        raise ValueError(f"Garantia deve estar entre 1 e {NUM_JOGOS}.")
+    opcoes, probs = _opcoes_e_probs(linhas)
+    total = int(np.prod([len(o) for o in opcoes]))
+    if total > limite:
+        raise ValueError(f"{total} combinações passam do limite de {limite} para o fechamento.")
+    codigos = codificar(opcoes)
+    # Entre candidatas equivalentes, fica a combinação mais provável
+    probabilidades = _probabilidades(codigos, probs)
+    pesos = 0.5 * probabilidades / probabilidades.max()
+    bilhetes = codigos[cobrir(codigos, NUM_JOGOS - garantia, trabalhadores, pesos)]
+    p14, p13 = _chances(bilhetes, probs)
+    return {
+        "garantia": garantia,
+        "combinacoes": total,
+        "apostas": len(bilhetes),
+        "custo": len(bilhetes) * VALOR_APOSTA_SIMPLES,
+        "economia": 1 - len(bilhetes) / total,
+        "p14": p14,
+        "p13_ou_mais": p13,
+        "bilhetes": bilhetes,
+        "opcoes": opcoes,  # coberturas de cada jogo: codificar(opcoes) refaz todas as combinações
+    }
+
+def bilhetes(fechamento):
+    # Apostas como tuplas de resultados, prontas para exportacao.gerar_arquivo
+    return decodificar(fechamento["bilhetes"])
+
+def relatorio(linhas, garantias=GARANTIAS_RELATORIO, trabalhadores=None):
+    # Custo x garantia: uma linha por garantia, sem os bilhetes
+    saida = []
+    for garantia in garantias:
+        inicio = time.perf_counter()
+        fechamento = gerar_fechamento(linhas, garantia, trabalhadores)
+        fechamento = {k: v for k, v in fechamento.items() if k not in ("bilhetes", "opcoes")}
+        fechamento["segundos"] = time.perf_counter() - inicio
+        saida.append(fechamento)
+    return saida
+
+def imprimir_relatorio(linhas_relatorio, titulo):
+    print(f"\n=== {titulo} ===")
+    print(f"{'Garantia':>8} {'Apostas':>8} {'Custo (R$)':>12} {'Economia':>9} {'P(14)':>9} {'P(13+)':>9} {'Tempo':>8}")
+    for r in linhas_relatorio:
+        print(f"{r['garantia']:>8} {r['apostas']:>8} {r['custo']:>12,.2f} {r['economia']:>8.1%} "
+              f"{r['p14']:>8.4%} {r['p13_ou_mais']:>8.4%} {r['segundos']:>7.2f}s")
+
+if __name__ == "__main__":
+    from app import CONFIG_APOSTAS, aplicar_estrategia
+    from benchmark import _jogos_gabarito
+
+    parser = argparse.ArgumentParser(description="Fechamentos (sistemas reduzidos) para as estratégias da Loteca Pro IA")
+    parser.add_argument("estrategias", nargs="*", default=["Magnata", "Dono da Zorra Toda"])
+    parser.add_argument("--trabalhadores", type=int, default=None)
+    args = parser.parse_args()
+
+    jogos = _jogos_gabarito()
+    for nome in args.estrategias:
+        if nome not in CONFIG_APOSTAS:
+            parser.error(f"estratégia desconhecida: {nome}")
+        imprimir_relatorio(relatorio(aplicar_estrategia(jogos, nome), trabalhadores=args.trabalhadores),
+                           f"{nome} sobre o DEFAULTS_GABARITO")
@@ -0,0 +1,139 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+
+# Histórico de coletas em SQLite (só acrescenta, nunca sobrescreve): cada execução
+# do coletor vira uma linha em `coletas` com os 14 jogos em `jogos`. Resultados reais
+# entram depois em `resultados`, por concurso, e alimentam o backtest.
+
+ARQUIVO_HISTORICO = os.environ.get('LOTECA_HISTORICO', 'historico.db')
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS coletas (
+    id INTEGER PRIMARY KEY,
+    concurso INTEGER,
+    fonte TEXT NOT NULL,
+    coletado_em TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_coletas_concurso ON coletas (concurso, coletado_em);
+CREATE INDEX IF NOT EXISTS idx_coletas_coletado_em ON coletas (coletado_em);
+
+CREATE TABLE IF NOT EXISTS jogos (
+    coleta_id INTEGER NOT NULL REFERENCES coletas (id),
+    jogo INTEGER NOT NULL,
+    mandante TEXT NOT NULL,
+    visitante TEXT NOT NULL,
+    prob_casa REAL,
+    prob_empate REAL,
+    prob_fora REAL,
+    PRIMARY KEY (coleta_id, jogo)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_jogos_mandante ON jogos (mandante);
+CREATE INDEX IF NOT EXISTS idx_jogos_visitante ON jogos (visitante);
+
+CREATE TABLE IF NOT EXISTS resultados (
+    concurso INTEGER NOT NULL,
+    jogo INTEGER NOT NULL,
+    resultado TEXT NOT NULL CHECK (resultado IN ('1', 'X', '2')),
+    PRIMARY KEY (concurso, jogo)
+) WITHOUT ROWID;
+"""
+
+# --- 1. CONEXÃO ---
+_preparados = set()
+
+@contextmanager
+def conectar(caminho=None):
+    caminho = caminho or ARQUIVO_HISTORICO
+    conexao = sqlite3.connect(caminho, timeout=10)
+    try:
+        conexao.row_factory = sqlite3.Row
+        conexao.execute("PRAGMA synchronous=NORMAL")
+        if caminho not in _preparados:
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.executescript(ESQUEMA)
+            _preparados.add(caminho)
+        yield conexao
+    finally:
+        conexao.close()
+
+# --- 2. ESCRITA ---
+def _linhas_jogos(coleta_id, jogos):
+    return [(coleta_id, int(j['Jogo']), j['Mandante'], j['Visitante'], j.get('Prob_Casa'), j.get('Prob_Empate'), j.get('Prob_Fora'))
+            for j in jogos]
+
+def registrar_coleta(jogos, fonte, concurso=None, coletado_em=None, caminho=None):
+    return registrar_coletas([(jogos, fonte, concurso, coletado_em)], caminho)[0]
+
+def registrar_coletas(coletas, caminho=None):
+    # Inserção em lote numa única transação: coletas = [(jogos, fonte, concurso, coletado_em), ...]
+    ids = []
+    with conectar(caminho) as conexao, conexao:
+        cursor = conexao.cursor()
+        linhas = []
+        for jogos, fonte, concurso, coletado_em in coletas:
+            cursor.execute("INSERT INTO coletas (concurso, fonte, coletado_em) VALUES (?, ?, ?)",
+                           (concurso, fonte, coletado_em or datetime.now().isoformat(timespec='seconds')))
+            ids.append(cursor.lastrowid)
+            linhas.extend(_linhas_jogos(cursor.lastrowid, jogos))
+        cursor.executemany("INSERT INTO jogos VALUES (?, ?, ?, ?, ?, ?, ?)", linhas)
+    return ids
+
+def registrar_resultados(resultados, caminho=None):
+    # resultados = [(concurso, jogo, '1'|'X'|'2'), ...]
+    with conectar(caminho) as conexao, conexao:
+        conexao.executemany("INSERT OR REPLACE INTO resultados VALUES (?, ?, ?)", resultados)
+
+# --- 3. CONSULTAS ---
+def jogos_do_time(time_nome, limite=200, caminho=None):
+    # Usa os dois índices (mandante e visitante) via UNION ALL em vez de um OR
+    sql = """
+        SELECT c.concurso, c.coletado_em, c.fonte, j.jogo, j.mandante, j.visitante, j.prob_casa, j.prob_empate, j.prob_fora
+        FROM (SELECT * FROM jogos WHERE mandante = :time UNION ALL SELECT * FROM jogos WHERE visitante = :time) AS j
+        JOIN coletas AS c ON c.id = j.coleta_id
+        ORDER BY c.coletado_em DESC
+        LIMIT :limite
+    """
+    with conectar(caminho) as conexao:
+        return [dict(r) for r in conexao.execute(sql, {"time": time_nome, "limite": limite})]
+
+def deriva_probabilidades(concurso, jogo, caminho=None):
+    sql = """
+        SELECT c.coletado_em, c.fonte, j.mandante, j.visitante, j.prob_casa, j.prob_empate, j.prob_fora
+        FROM coletas AS c JOIN jogos AS j ON j.coleta_id = c.id AND j.jogo = ?
+        WHERE c.concurso = ?
+        ORDER BY c.coletado_em
+    """
+    with conectar(caminho) as conexao:
+        return [dict(r) for r in conexao.execute(sql, (jogo, concurso))]
+
+def concursos_para_backtest(caminho=None):
+    # Última coleta de cada concurso + resultados reais, no formato do backtest
+    sql = """
+        SELECT c.concurso, j.jogo, j.mandante, j.visitante, j.prob_casa, j.prob_empate, j.prob_fora, r.resultado
+        FROM coletas AS c
+        JOIN (SELECT concurso, MAX(coletado_em) AS ultima FROM coletas WHERE concurso IS NOT NULL GROUP BY concurso) AS u
+             ON u.concurso = c.concurso AND u.ultima = c.coletado_em
+        JOIN jogos AS j ON j.coleta_id = c.id
+        LEFT JOIN resultados AS r ON r.concurso = c.concurso AND r.jogo = j.jogo
+        ORDER BY c.concurso, c.id, j.jogo
+    """
+    concursos = {}
+    with conectar(caminho) as conexao:
+        for r in conexao.execute(sql):
+            jogos = concursos.setdefault(r['concurso'], {})
+            jogos.setdefault(r['jogo'], {"Jogo": r['jogo'], "Mandante": r['mandante'], "Visitante": r['visitante'],
+                                         "Prob_Casa": r['prob_casa'], "Prob_Empate": r['prob_empate'], "Prob_Fora": r['prob_fora'],
+                                         "Resultado": r['resultado']})
+    return [{"concurso": c, "jogos": list(jogos.values())} for c, jogos in concursos.items()]
+
+if __name__ == "__main__":
+    import sys
+    # Uso: python historico.py resultados <concurso> <14 resultados, ex.: 1X21X1122X1X12>
+    if len(sys.argv) == 4 and sys.argv[1] == "resultados" and len(sys.argv[3]) == 14:
+        concurso, palpites = int(sys.argv[2]), sys.argv[3].upper()
+        registrar_resultados([(concurso, i + 1, r) for i, r in enumerate(palpites)])
+        print(f"✅ Resultados do concurso {concurso} registrados em '{ARQUIVO_HISTORICO}'")
+    else:
+        print("Uso: python historico.py resultados <concurso> <14 resultados>")
@@ -0,0 +1,159 @@
+import codecs
+from html.parser import HTMLParser
+
+# Leitura das páginas das fontes numa única passada (streaming): o HTML entra em
+# pedaços, só os trechos de interesse são guardados e a leitura para assim que os
+# 14 jogos estão completos, sem montar a árvore inteira do documento.
+
+TAMANHO_PEDACO = 16 * 1024
+
+def _numero(texto):
+    return float(texto.strip().replace('%', '').replace(',', '.'))
+
+class _LeitorStreaming(HTMLParser):
+    completo = False
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+
+    def ler(self, pedacos, codificacao='utf-8'):
+        # pedacos: bytes, str ou iterável de bytes (ex.: response.iter_content). Um corpo
+        # inteiro é fatiado em pedaços, senão o feed leria o documento todo antes de parar
+        if isinstance(pedacos, (bytes, str)):
+            corpo = pedacos
+            pedacos = (corpo[i:i + TAMANHO_PEDACO] for i in range(0, len(corpo), TAMANHO_PEDACO))
+        decodificador = codecs.getincrementaldecoder(codificacao or 'utf-8')(errors='replace')
+        for pedaco in pedacos:
+            self.feed(decodificador.decode(pedaco) if isinstance(pedaco, bytes) else pedaco)
+            if self.completo:
+                break
+        else:
+            self.feed(decodificador.decode(b'', final=True))
+            self.close()
+        return self.resultado()
+
+class LeitorVovoteca(_LeitorStreaming):
+    # Guarda as células de cada <tr id="tr-linha-N"> e o texto dos
+    # <td id="resultado-{N-1}-home|away">, onde quer que estejam no documento
+    def __init__(self):
+        super().__init__()
+        self.linhas = {}
+        self.percentuais = {}
+        self._linha = None       # número do jogo da linha aberta
+        self._celulas = None     # células da linha aberta
+        self._texto_celula = None
+        self._profundidade_td = 0
+        self._percentual = None  # chave (idx, lado) do td de percentual aberto
+        self._texto_percentual = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'tr':
+            id_ = dict(attrs).get('id') or ''
+            if id_.startswith('tr-linha-') and id_[9:].isdigit():
+                self._linha, self._celulas = int(id_[9:]), []
+        elif tag == 'td':
+            id_ = dict(attrs).get('id') or ''
+            if id_.startswith('resultado-'):
+                partes = id_.split('-')
+                if len(partes) == 3 and partes[1].isdigit() and partes[2] in ('home', 'away'):
+                    self._percentual, self._texto_percentual = (int(partes[1]), partes[2]), []
+            if self._linha is not None:
+                self._profundidade_td += 1
+                if self._profundidade_td == 1:
+                    self._texto_celula = []
+
+    def handle_endtag(self, tag):
+        if tag == 'td':
+            if self._percentual is not None:
+                self.percentuais[self._percentual] = ''.join(self._texto_percentual)
+                self._percentual = None
+                self.completo = self._tem_tudo()
+            if self._linha is not None and self._profundidade_td:
+                self._profundidade_td -= 1
+                if self._profundidade_td == 0:
+                    self._celulas.append(''.join(self._texto_celula).strip())
+                    self._texto_celula = None
+        elif tag == 'tr' and self._linha is not None:
+            self.linhas.setdefault(self._linha, self._celulas)
+            self._linha, self._celulas, self._profundidade_td = None, None, 0
+            self.completo = self._tem_tudo()
+
+    def handle_data(self, dados):
+        if self._texto_celula is not None:
+            self._texto_celula.append(dados)
+        if self._percentual is not None:
+            self._texto_percentual.append(dados)
+
+    def _tem_tudo(self):
+        return all(i in self.linhas and (i - 1, 'home') in self.percentuais and (i - 1, 'away') in self.percentuais
+                   for i in range(1, 15))
+
+    def resultado(self):
+        dados = []
+        for i in range(1, 15):
+            cols = self.linhas.get(i)
+            if not cols or len(cols) < 6: continue
+            idx = i - 1
+            try:
+                p1 = _numero(self.percentuais[(idx, 'home')])
+                p2 = _numero(self.percentuais[(idx, 'away')])
+                px = 100 - (p1 + p2)
+            except (KeyError, ValueError): p1, px, p2 = 33, 34, 33
+            dados.append({"Jogo": i, "Mandante": cols[1], "Visitante": cols[5], "Prob_Casa": p1, "Prob_Empate": px, "Prob_Fora": p2})
+        return dados
+
+class LeitorCaixa(_LeitorStreaming):
+    # Lê só a primeira <table class="loteca"> e para ao fechá-la
+    def __init__(self):
+        super().__init__()
+        self.linhas = []
+        self._dentro = False
+        self._profundidade_tabela = 0
+        self._celulas = None
+        self._texto_celula = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            if self._dentro:
+                self._profundidade_tabela += 1
+            elif 'loteca' in (dict(attrs).get('class') or '').split():
+                self._dentro, self._profundidade_tabela = True, 1
+        elif not self._dentro:
+            return
+        elif tag == 'tr':
+            self._celulas = []
+        elif tag == 'td' and self._celulas is not None:
+            self._texto_celula = []
+            self._celulas.append(self._texto_celula)
+
+    def handle_endtag(self, tag):
+        if not self._dentro:
+            return
+        if tag == 'td':
+            self._texto_celula = None
+        elif tag == 'tr' and self._celulas is not None:
+            self.linhas.append([''.join(c).strip() for c in self._celulas])
+            self._celulas = None
+        elif tag == 'table':
+            self._profundidade_tabela -= 1
+            if self._profundidade_tabela == 0:
+                self._dentro, self.completo = False, True
+
+    def handle_data(self, dados):
+        if self._texto_celula is not None:
+            self._texto_celula.append(dados)
+
+    def resultado(self):
+        dados = []
+        for cols in self.linhas:
+            if len(cols) < 5 or not cols[0].isdigit(): continue
+            mandante, visitante = cols[2], cols[4]
+            if mandante and visitante:
+                dados.append({"Jogo": int(cols[0]), "Mandante": mandante, "Visitante": visitante, "Prob_Casa": 33, "Prob_Empate": 34, "Prob_Fora": 33})
+        return dados
+
+def ler_vovoteca(pedacos, codificacao='utf-8'):
+    return LeitorVovoteca().ler(pedacos, codificacao)
+
+def ler_caixa(pedacos, codificacao='utf-8'):
+    return LeitorCaixa().ler(pedacos, codificacao)
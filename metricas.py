@@ -0,0 +1,156 @@
+import bisect
+import os
+import re
+import threading
+import time
+
+# Instrumentação sem dependências: contadores e histogramas no formato texto do
+# Prometheus (GET /metrics) e cronômetros por etapa. Com LOTECA_METRICAS=0 tudo
+# vira no-op. As métricas são por processo: cada worker do gunicorn expõe as suas.
+
+HABILITADO = os.environ.get('LOTECA_METRICAS', '1') != '0'
+# Perfil por requisição (cProfile): '' desliga, 'cabecalho' liga com "X-Perfil: 1", 'sempre' liga em todas
+MODO_PERFIL = os.environ.get('LOTECA_PERFIL', '')
+PASTA_PERFIS = os.environ.get('LOTECA_PASTA_PERFIS', 'perfis')
+
+LIMITES_PADRAO = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _rotulos(nomes, valores):
+    if not nomes:
+        return ''
+    return '{' + ','.join(f'{n}="{_escapar(v)}"' for n, v in zip(nomes, valores)) + '}'
+
+class Contador:
+    tipo = 'counter'
+
+    def __init__(self, nome, ajuda, rotulos=()):
+        self.nome, self.ajuda, self.rotulos = nome, ajuda, tuple(rotulos)
+        self._valores = {}
+        self._trava = threading.Lock()
+
+    def incrementar(self, *valores, quantidade=1):
+        if not HABILITADO: return
+        with self._trava:
+            self._valores[valores] = self._valores.get(valores, 0) + quantidade
+
+    def linhas(self):
+        with self._trava:
+            itens = sorted(self._valores.items())
+        return [f'{self.nome}{_rotulos(self.rotulos, v)} {n}' for v, n in itens]
+
+class Histograma:
+    tipo = 'histogram'
+
+    def __init__(self, nome, ajuda, rotulos=(), limites=LIMITES_PADRAO):
+        self.nome, self.ajuda, self.rotulos, self.limites = nome, ajuda, tuple(rotulos), tuple(limites)
+        self._series = {}  # valores dos rótulos -> [contagens por faixa, soma, total]
+        self._trava = threading.Lock()
+
+    def observar(self, valor, *valores):
+        if not HABILITADO: return
+        faixa = bisect.bisect_left(self.limites, valor)
+        with self._trava:
+            serie = self._series.get(valores)
+            if serie is None:
+                serie = self._series[valores] = [[0] * (len(self.limites) + 1), 0.0, 0]
+            serie[0][faixa] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def linhas(self):
+        with self._trava:
+            itens = sorted((v, (list(s[0]), s[1], s[2])) for v, s in self._series.items())
+        saida = []
+        for valores, (contagens, soma, total) in itens:
+            acumulado = 0
+            for limite, n in zip(self.limites + ('+Inf',), contagens):
+                acumulado += n
+                saida.append(f'{self.nome}_bucket{_rotulos(self.rotulos + ("le",), valores + (limite,))} {acumulado}')
+            saida.append(f'{self.nome}_sum{_rotulos(self.rotulos, valores)} {soma:.6f}')
+            saida.append(f'{self.nome}_count{_rotulos(self.rotulos, valores)} {total}')
+        return saida
+
+# --- 1. MÉTRICAS DA APLICAÇÃO ---
+REQUISICOES = Histograma('loteca_requisicao_segundos', 'Duração das requisições HTTP', ('rota', 'metodo'))
+RESPOSTAS = Contador('loteca_respostas_total', 'Respostas HTTP por rota e status', ('rota', 'metodo', 'status'))
+ETAPAS = Histograma('loteca_etapa_segundos', 'Duração de cada etapa interna (formulário, estratégia, render, coleta...)', ('etapa',))
+COLETAS = Histograma('loteca_coleta_segundos', 'Duração total de cada coleta', ('fonte',), limites=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60))
+CONSULTAS_FONTES = Contador('loteca_fonte_total', 'Consultas às fontes por resultado (rede, 304, fresco, falha)', ('fonte', 'resultado'))
+CACHE_PAGINAS = Contador('loteca_cache_paginas_total', 'Consultas ao cache de páginas do GET /', ('resultado',))
+
+REGISTRO = [REQUISICOES, RESPOSTAS, ETAPAS, COLETAS, CONSULTAS_FONTES, CACHE_PAGINAS]
+
+# --- 2. CRONÔMETRO DE ETAPAS ---
+_local = threading.local()
+
+class _SemCronometro:
+    def __enter__(self): return self
+    def __exit__(self, *erro): return False
+
+_SEM_CRONOMETRO = _SemCronometro()
+
+class _Cronometro:
+    __slots__ = ('nome', 'inicio')
+
+    def __init__(self, nome):
+        self.nome = nome
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *erro):
+        decorrido = time.perf_counter() - self.inicio
+        ETAPAS.observar(decorrido, self.nome)
+        etapas = getattr(_local, 'etapas', None)
+        if etapas is not None:
+            etapas.append((self.nome, decorrido))
+        return False
+
+def etapa(nome):
+    # with etapa('render'): ... -> alimenta loteca_etapa_segundos e o Server-Timing da requisição
+    return _Cronometro(nome) if HABILITADO else _SEM_CRONOMETRO
+
+def iniciar_etapas():
+    _local.etapas = []
+
+def encerrar_etapas():
+    etapas, _local.etapas = getattr(_local, 'etapas', None), None
+    return etapas or []
+
+def server_timing(etapas):
+    return ', '.join(f'{nome};dur={decorrido * 1e3:.2f}' for nome, decorrido in etapas)
+
+# --- 3. PERFIL POR REQUISIÇÃO ---
+def perfil_solicitado(cabecalhos):
+    return MODO_PERFIL == 'sempre' or (MODO_PERFIL == 'cabecalho' and cabecalhos.get('X-Perfil') == '1')
+
+def iniciar_perfil():
+    import cProfile
+    perfil = cProfile.Profile()
+    perfil.enable()
+    return perfil
+
+def salvar_perfil(perfil, rotulo):
+    # Grava o .prof (abre com pstats ou snakeviz) e devolve o nome do arquivo
+    perfil.disable()
+    os.makedirs(PASTA_PERFIS, exist_ok=True)
+    rotulo = re.sub(r'\W+', '_', rotulo).strip('_') or 'raiz'
+    nome = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{threading.get_ident() % 10000}-{rotulo}.prof"
+    perfil.dump_stats(os.path.join(PASTA_PERFIS, nome))
+    return nome
+
+# --- 4. EXPOSIÇÃO ---
+def expor(extras=()):
+    # extras: [(nome, tipo, ajuda, [(rótulos dict, valor), ...])] calculados na hora (ex.: estatísticas do cache)
+    saida = []
+    for metrica in REGISTRO:
+        saida += [f'# HELP {metrica.nome} {metrica.ajuda}', f'# TYPE {metrica.nome} {metrica.tipo}']
+        saida += metrica.linhas()
+    for nome, tipo, ajuda, amostras in extras:
+        saida += [f'# HELP {nome} {ajuda}', f'# TYPE {nome} {tipo}']
+        saida += [f'{nome}{_rotulos(tuple(r), tuple(r.values()))} {v}' for r, v in amostras]
+    return '\n'.join(saida) + '\n'
@@ -0,0 +1,187 @@
+import numpy as np
+
+# Motor numérico da Loteca: trabalha sobre a matriz 14x3 (Casa, Empate, Fora)
+# e sobre a cobertura de cada jogo (1 = SECO, 2 = DUPLO, 3 = TRIPLO).
+# Nada aqui enumera as 3^14 combinações: a distribuição de acertos sai de
+# uma convolução (programação dinâmica) jogo a jogo.
+
+NUM_JOGOS = 14
+SECO, DUPLO, TRIPLO = 1, 2, 3
+COBERTURA_POR_TIPO = {"SECO": SECO, "DUPLO": DUPLO, "TRIPLO": TRIPLO}
+
+# --- 1. ENTRADA ---
+def matriz_probabilidades(jogos):
+    # Aceita lista de dicts (formato do jogos.json) ou array (..., 14, 3)
+    if isinstance(jogos, np.ndarray):
+        probs = jogos.astype(float)
+    else:
+        probs = np.array([[j['Prob_Casa'], j['Prob_Empate'], j['Prob_Fora']] for j in jogos], dtype=float)
+    total = probs.sum(axis=-1, keepdims=True)
+    total[total == 0] = 1
+    return probs / total
+
+def coberturas_dos_tipos(tipos):
+    return np.array([COBERTURA_POR_TIPO[t] for t in tipos], dtype=np.int8)
+
+# --- 2. PROBABILIDADES DE ACERTO ---
+def probabilidade_acerto_por_jogo(probs, coberturas):
+    # Chance de acertar cada jogo: soma das k maiores probabilidades,
+    # onde k é a cobertura (SECO pega o favorito, DUPLO favorito + vice).
+    probs, coberturas = np.asarray(probs, dtype=float), np.asarray(coberturas)
+    formato = np.broadcast_shapes(probs.shape[:-1], coberturas.shape)
+    probs = np.broadcast_to(probs, formato + probs.shape[-1:])
+    coberturas = np.broadcast_to(coberturas, formato)
+    acumulado = np.cumsum(-np.sort(-probs, axis=-1), axis=-1)
+    q = np.take_along_axis(acumulado, (coberturas - 1)[..., None].astype(np.intp), axis=-1)[..., 0]
+    return np.clip(q, 0.0, 1.0)
+
+def distribuicao_acertos(q):
+    # q: (..., 14) chances independentes de acerto. Devolve (..., 15) com
+    # P(0 acertos) ... P(14 acertos), vetorizado sobre todas as dimensões extras.
+    q = np.asarray(q, dtype=float)
+    n = q.shape[-1]
+    dist = np.zeros(q.shape[:-1] + (n + 1,))
+    dist[..., 0] = 1.0
+    for i in range(n):
+        qi = q[..., i, None]
+        dist[..., 1:i + 2] = dist[..., 1:i + 2] * (1 - qi) + dist[..., 0:i + 1] * qi
+        dist[..., 0] *= (1 - q[..., i])
+    return dist
+
+def resumo_premios(probs, coberturas):
+    q = probabilidade_acerto_por_jogo(probs, coberturas)
+    dist = distribuicao_acertos(q)
+    return {
+        "distribuicao": dist,
+        "p14": dist[..., 14],
+        "p13": dist[..., 13],
+        "esperado": q.sum(axis=-1),
+    }
+
+# --- 3. OTIMIZAÇÃO POR ORÇAMENTO ---
+VALOR_APOSTA_SIMPLES = 2.00
+OBJETIVOS = ("p14", "esperado")
+
+def custo_aposta(duplos, triplos):
+    return VALOR_APOSTA_SIMPLES * (2 ** duplos) * (3 ** triplos)
+
+def _ganhos(probs, objetivo):
+    # Contribuição aditiva de cada jogo para cada cobertura (14, 3):
+    # log da chance de acerto para P(14) (produto vira soma), a própria chance para a média.
+    acumulado = np.clip(np.cumsum(-np.sort(-probs, axis=-1), axis=-1), 0.0, 1.0)
+    if objetivo == "p14":
+        return np.log(np.maximum(acumulado, 1e-300))
+    return acumulado
+
+def otimizar_cobertura(probs, orcamento, objetivo="p14"):
+    # Programação dinâmica exata sobre a grade de custos 2^a * 3^b: dp[a, b] guarda
+    # o melhor valor usando a duplos e b triplos nos jogos já vistos. A grade é
+    # podada ao que cabe no orçamento, então o estado nunca passa de 15x15.
+    if objetivo not in OBJETIVOS:
+        raise ValueError(f"Objetivo inválido: {objetivo}")
+    probs = matriz_probabilidades(np.asarray(probs, dtype=float))
+    ganhos = _ganhos(probs, objetivo)
+    n = probs.shape[0]
+
+    if not np.isfinite(orcamento):
+        raise ValueError(f"Orçamento inválido: {orcamento}")
+    # Acima de 3^n (tudo triplo) nenhuma combinação a mais cabe: a grade já está completa
+    limite = min(orcamento / VALOR_APOSTA_SIMPLES, 3.0 ** n)
+    if limite < 1:
+        return None
+    max_a = min(n, int(np.floor(np.log2(limite) + 1e-9)))
+    max_b = min(n, int(np.floor(np.log(limite) / np.log(3) + 1e-9)))
+
+    dp = np.full((max_a + 1, max_b + 1), -np.inf)
+    dp[0, 0] = 0.0
+    escolhas = np.zeros((n, max_a + 1, max_b + 1), dtype=np.int8)
+    for i in range(n):
+        opcoes = np.full((3,) + dp.shape, -np.inf)
+        opcoes[0] = dp + ganhos[i, 0]
+        opcoes[1, 1:, :] = dp[:-1, :] + ganhos[i, 1]
+        opcoes[2, :, 1:] = dp[:, :-1] + ganhos[i, 2]
+        escolhas[i] = np.argmax(opcoes, axis=0)
+        dp = np.max(opcoes, axis=0)
+
+    a_grade, b_grade = np.meshgrid(np.arange(max_a + 1), np.arange(max_b + 1), indexing='ij')
+    custos = VALOR_APOSTA_SIMPLES * (2.0 ** a_grade) * (3.0 ** b_grade)
+    valores = np.where(custos <= orcamento + 1e-9, dp, -np.inf)
+    # Empate no objetivo: fica com a combinação mais barata
+    ordem = np.lexsort((custos.ravel(), -valores.ravel()))
+    a, b = np.unravel_index(ordem[0], dp.shape)
+
+    coberturas = np.ones(n, dtype=np.int8)
+    for i in range(n - 1, -1, -1):
+        escolha = escolhas[i, a, b]
+        coberturas[i] = escolha + 1
+        if escolha == 1: a -= 1
+        elif escolha == 2: b -= 1
+
+    duplos, triplos = int((coberturas == DUPLO).sum()), int((coberturas == TRIPLO).sum())
+    return {
+        "coberturas": coberturas,
+        "duplos": duplos,
+        "triplos": triplos,
+        "valor": custo_aposta(duplos, triplos),
+        "objetivo": objetivo,
+        "pontuacao": float(np.exp(valores.ravel()[ordem[0]]) if objetivo == "p14" else valores.ravel()[ordem[0]]),
+    }
+
+# --- 4. LOTE: VÁRIOS CONCURSOS x VÁRIAS ESTRATÉGIAS ---
+RESULTADOS = ('1', 'X', '2')
+
+def _tabela_palpites():
+    # Índice = (cobertura - 1) * 9 + favorito * 3 + vice, com os mesmos textos de gerar_palpite
+    textos, classes = [], []
+    for cobertura in (SECO, DUPLO, TRIPLO):
+        for fav in range(3):
+            for vice in range(3):
+                if cobertura == TRIPLO:
+                    textos.append("TRIPLO (1 X 2)")
+                    classes.append("bg-primary text-white border-primary")
+                elif cobertura == DUPLO:
+                    par = "".join(sorted([RESULTADOS[fav], RESULTADOS[vice]])).replace('12', '1 2')
+                    textos.append(f"DUPLO {par}")
+                    classes.append("bg-warning text-dark border-warning")
+                else:
+                    textos.append(f"COLUNA {RESULTADOS[fav]}")
+                    classes.append("bg-success text-white border-success")
+    return np.array(textos, dtype=object), np.array(classes, dtype=object)
+
+TEXTOS_PALPITE, CLASSES_PALPITE = _tabela_palpites()
+
+def coberturas_das_estrategias(probs, estrategias):
+    # probs: (N, 14, 3); estrategias: sequência de (duplos, triplos).
+    # Triplos vão para os jogos de maior risco, depois os duplos: (N, M, 14).
+    probs = np.asarray(probs, dtype=float)
+    risco = -probs.max(axis=-1)
+    # Reproduz o sort_values(ascending=False) do pandas (quicksort sobre o array invertido)
+    # para que os empates de risco caiam nos mesmos jogos de antes
+    n = risco.shape[-1]
+    ordem = (n - 1 - np.argsort(risco[..., ::-1], axis=-1, kind='quicksort'))[..., ::-1]
+    posicao = np.argsort(ordem, axis=-1)[:, None, :]
+    duplos = np.array([d for d, _ in estrategias])[None, :, None]
+    triplos = np.array([t for _, t in estrategias])[None, :, None]
+    return np.where(posicao < triplos, TRIPLO, np.where(posicao < triplos + duplos, DUPLO, SECO)).astype(np.int8)
+
+def indices_palpites(probs, coberturas):
+    ordem = np.argsort(-np.asarray(probs), axis=-1, kind='stable')
+    fav, vice = ordem[..., 0], ordem[..., 1]
+    if coberturas.ndim > fav.ndim:
+        fav, vice = fav[:, None, :], vice[:, None, :]
+    return (coberturas.astype(np.intp) - 1) * 9 + fav * 3 + vice
+
+def processar_lote(probs, estrategias):
+    probs = matriz_probabilidades(np.asarray(probs, dtype=float))
+    coberturas = coberturas_das_estrategias(probs, estrategias)
+    indices = indices_palpites(probs, coberturas)
+    resumo = resumo_premios(probs[:, None, :, :], coberturas)
+    return {
+        "coberturas": coberturas,
+        "palpites": TEXTOS_PALPITE[indices],
+        "classes": CLASSES_PALPITE[indices],
+        "custos": np.array([custo_aposta(d, t) for d, t in estrategias]),
+        "p14": resumo['p14'],
+        "p13": resumo['p13'],
+        "esperado": resumo['esperado'],
+    }